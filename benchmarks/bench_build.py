@@ -0,0 +1,107 @@
+"""
+Benchmarks full builds of synthetic corpora, reporting pages/sec, MB/sec and peak RSS.
+Each case runs in a fresh process so that its peak RSS is measured in isolation.
+
+Usage: python benchmarks/bench_build.py [--pages N] [--jobs N] [--json PATH]
+"""
+
+import json
+import resource
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from os import devnull, dup, dup2, path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+# pylint: disable=wrong-import-position
+from corpus import DEFAULT_SPEC, KINDS, CorpusSpec, generate_corpus
+from main import generate_pages_recursive
+
+TEMPLATE = path.join(path.dirname(path.abspath(__file__)), "..", "template.html")
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process and its children in MB"""
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1e6 if sys.platform == "darwin" else 1e3
+    return max(self_rss, children_rss) / scale
+
+
+def run_case(spec: CorpusSpec, jobs: int) -> dict:
+    """Generates the corpus described by `spec` and times a full build of it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        content_dir = path.join(tmp, "content")
+        public_dir = path.join(tmp, "public")
+        size = generate_corpus(content_dir, spec)
+
+        # silence per-page progress output, including that of worker processes
+        stdout = dup(1)
+        with open(devnull, "w", encoding="utf-8") as null:
+            dup2(null.fileno(), 1)
+        try:
+            start = time.perf_counter()
+            generate_pages_recursive(content_dir, public_dir, TEMPLATE, jobs=jobs)
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout.flush()
+            dup2(stdout, 1)
+
+    return {
+        **spec._asdict(),
+        "jobs": jobs,
+        "bytes": size,
+        "seconds": round(elapsed, 4),
+        "pages_per_sec": round(spec.pages / elapsed, 1),
+        "mb_per_sec": round(size / 1e6 / elapsed, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    """Runs every benchmark case, printing a summary and optionally saving JSON"""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=DEFAULT_SPEC.pages)
+    parser.add_argument("--depth", type=int, default=DEFAULT_SPEC.depth)
+    parser.add_argument("--blocks", type=int, default=DEFAULT_SPEC.blocks)
+    parser.add_argument(
+        "--inline-density", type=float, default=DEFAULT_SPEC.inline_density
+    )
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--json", help="file to save the results to")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'corpus':<18}{'pages/sec':>12}{'MB/sec':>10}{'peak RSS MB':>14}")
+
+    for kind in args.kinds:
+        # pathological corpora have much larger pages, so fewer are generated
+        pages = args.pages if kind == "mixed" else max(1, args.pages // 10)
+        spec = CorpusSpec(kind, pages, args.depth, args.blocks, args.inline_density)
+
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            result = executor.submit(run_case, spec, args.jobs).result()
+
+        results.append(result)
+        print(
+            f"{kind:<18}{result['pages_per_sec']:>12,.1f}"
+            f"{result['mb_per_sec']:>10.2f}{result['peak_rss_mb']:>14.1f}"
+        )
+
+    if args.json:
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
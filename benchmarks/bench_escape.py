@@ -0,0 +1,91 @@
+"""
+Reports the cost of escaping leaf node values and attributes, comparing text without
+any special characters, which takes the fast path, against text that must be
+escaped, and against rendering the same node without escaping.
+
+Usage: python benchmarks/bench_escape.py [call count]
+"""
+
+import sys
+import time
+from os import path
+from typing import Iterator
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+# pylint: disable=wrong-import-position
+from htmlnode import LeafNode, escape
+
+TEXTS = {
+    "short": "some text",
+    "long": "the ring of power was forged in the fires of mount doom " * 4,
+    "short special": "a < b & c",
+    "long special": "the ring of power was forged in the <fires> of mount doom " * 4,
+}
+URL = "https://www.boot.dev/courses"
+
+
+class UnescapedLeafNode(LeafNode):
+    """A `LeafNode` rendered exactly as `LeafNode` is, but without calling `escape`"""
+
+    __slots__ = ()
+
+    def props_to_html(self) -> str | None:
+        if not self.props:
+            return None
+
+        html_props = ""
+
+        for key, value in self.props.items():
+            html_props += f' {key}="{value}"'
+
+        return html_props
+
+    def iter_html(self) -> Iterator[str]:
+        if (self.value != "") and not self.value:
+            raise ValueError("LeafNode must have a value")
+        if not self.tag:
+            yield self.value
+            return
+
+        if self.props:
+            html_props = self.props_to_html()
+        else:
+            html_props = ""
+
+        yield f"<{self.tag}{html_props}>{self.value}</{self.tag}>"
+
+
+def nanoseconds_per_call(function, argument, count: int, repeat: int = 5) -> float:
+    """Returns the best average time taken by `function(argument)` out of `repeat` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e9
+
+
+def main():
+    """Runs every benchmark case and prints the results"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print(
+        f"{'text':<16}{'escape ns':>11}{'to_html ns':>12}"
+        f"{'unescaped ns':>14}{'added ns':>10}"
+    )
+    for name, text in TEXTS.items():
+        node = LeafNode("a", text, {"href": URL})
+        escape_time = nanoseconds_per_call(escape, text, count)
+        html_time = nanoseconds_per_call(LeafNode.to_html, node, count)
+        unescaped = UnescapedLeafNode("a", text, {"href": URL})
+        unescaped_time = nanoseconds_per_call(LeafNode.to_html, unescaped, count)
+        print(
+            f"{name:<16}{escape_time:>11.0f}{html_time:>12.0f}{unescaped_time:>14.0f}"
+            f"{html_time - unescaped_time:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
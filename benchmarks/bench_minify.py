@@ -0,0 +1,89 @@
+"""
+Benchmarks full builds of each synthetic corpus with and without `--minify`,
+reporting how much longer minified builds take and how many bytes they save.
+
+Usage: python benchmarks/bench_minify.py [--pages N] [--repeat N]
+"""
+
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from os import path, walk
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+# pylint: disable=wrong-import-position
+from corpus import DEFAULT_SPEC, KINDS, CorpusSpec, generate_corpus
+from main import generate_pages_recursive
+from markdown_blocks import BLOCK_MEMO
+
+TEMPLATE = path.join(path.dirname(path.abspath(__file__)), "..", "template.html")
+
+
+def output_size(dir_path: str) -> int:
+    """Returns the total size of the html files under `dir_path`"""
+    return sum(
+        path.getsize(path.join(root, file_name))
+        for root, _, file_names in walk(dir_path)
+        for file_name in file_names
+        if file_name.endswith(".html")
+    )
+
+
+def build_seconds(
+    content_dir: str, tmp: str, minify: bool, repeat: int
+) -> tuple[float, int]:
+    """
+    Returns the best time taken by a full build of `content_dir` into a fresh
+    directory out of `repeat` runs, and the size of the pages it wrote
+    """
+    best = float("inf")
+    for run in range(repeat):
+        public_dir = path.join(tmp, f"public-{minify}-{run}")
+        BLOCK_MEMO.clear()
+        with redirect_stdout(StringIO()):
+            start = time.perf_counter()
+            generate_pages_recursive(content_dir, public_dir, TEMPLATE, minify=minify)
+            best = min(best, time.perf_counter() - start)
+    return best, output_size(public_dir)
+
+
+def main():
+    """Runs the benchmark for each corpus and prints the results"""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    args = parser.parse_args()
+
+    print(
+        f"{'corpus':<18}{'plain sec':>11}{'minify sec':>12}"
+        f"{'overhead':>10}{'saved':>8}"
+    )
+    for kind in args.kinds:
+        # pathological corpora have much larger pages, so fewer are generated
+        pages = args.pages if kind == "mixed" else max(1, args.pages // 10)
+        spec = CorpusSpec(kind, pages, DEFAULT_SPEC.depth, DEFAULT_SPEC.blocks)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            content_dir = path.join(tmp, "content")
+            generate_corpus(content_dir, spec)
+            plain_seconds, plain_size = build_seconds(
+                content_dir, tmp, False, args.repeat
+            )
+            minify_seconds, minified_size = build_seconds(
+                content_dir, tmp, True, args.repeat
+            )
+
+        print(
+            f"{kind:<18}{plain_seconds:>11.3f}{minify_seconds:>12.3f}"
+            f"{minify_seconds / plain_seconds - 1:>10.1%}"
+            f"{1 - minified_size / plain_size:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
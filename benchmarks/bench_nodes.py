@@ -0,0 +1,65 @@
+"""
+Reports the memory used per node and the node construction throughput
+of `HTMLNode`s and `TextNode`s.
+
+Usage: python benchmarks/bench_nodes.py [node count]
+"""
+
+import sys
+import time
+import tracemalloc
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "src"))
+
+# pylint: disable=wrong-import-position
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+TEXT = "some text"
+URL = "https://www.boot.dev"
+
+CASES = {
+    "LeafNode": lambda: LeafNode("b", TEXT),
+    "LeafNode with props": lambda: LeafNode("a", TEXT, {"href": URL}),
+    "ParentNode": lambda: ParentNode("p", []),
+    "TextNode": lambda: TextNode(TEXT, TextType.Bold),
+}
+
+
+def bytes_per_node(factory, count: int) -> float:
+    """Returns the average memory allocated for each of `count` nodes from `factory`"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    nodes = [factory() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    list_size = sys.getsizeof(nodes)
+    return (after - before - list_size) / count
+
+
+def nodes_per_second(factory, count: int, repeat: int = 5) -> float:
+    """Returns the number of nodes `factory` can construct per second, best of `repeat`"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            factory()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def main():
+    """Runs every benchmark case and prints the results"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print(f"{'node':<22}{'bytes/node':>12}{'nodes/sec':>14}")
+    for name, factory in CASES.items():
+        size = bytes_per_node(factory, count)
+        rate = nodes_per_second(factory, count)
+        print(f"{name:<22}{size:>12.1f}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Generates synthetic `content` directories for benchmarking builds.
+
+Usage: python benchmarks/corpus.py OUTPUT_DIR [--kind KIND] [--pages N] [--depth N] ...
+"""
+
+import random
+from argparse import ArgumentParser
+from os import makedirs, path
+from typing import NamedTuple
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron "
+    "while elves and dwarves and men of the west fought long against shadow"
+).split()
+
+
+class CorpusSpec(NamedTuple):
+    """Parameters describing a synthetic corpus"""
+
+    kind: str = "mixed"
+    pages: int = 200
+    depth: int = 3
+    blocks: int = 40
+    inline_density: float = 0.2
+    seed: int = 0
+
+
+DEFAULT_SPEC = CorpusSpec()
+
+
+def _words(rng: random.Random, count: int, inline_density: float) -> str:
+    words = []
+    for _ in range(count):
+        word = rng.choice(WORDS)
+        if rng.random() < inline_density:
+            word = rng.choice(
+                (
+                    f"**{word}**",
+                    f"*{word}*",
+                    f"`{word}`",
+                    f"[{word}](/{word})",
+                    f"![{word}](/images/{word}.png)",
+                )
+            )
+        words.append(word)
+    return " ".join(words)
+
+
+def _mixed_block(rng: random.Random, spec: CorpusSpec) -> str:
+    density = spec.inline_density
+    match rng.randrange(6):
+        case 0:
+            return f"{'#' * rng.randint(2, 6)} {_words(rng, 5, density)}"
+        case 1:
+            lines = [f"print({rng.choice(WORDS)!r})" for _ in range(rng.randint(2, 12))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        case 2:
+            lines = [f"> {_words(rng, 12, density)}" for _ in range(rng.randint(1, 4))]
+            return "\n".join(lines)
+        case 3:
+            lines = [f"* {_words(rng, 8, density)}" for _ in range(rng.randint(2, 8))]
+            return "\n".join(lines)
+        case 4:
+            count = rng.randint(2, 8)
+            lines = [f"{i + 1}. {_words(rng, 8, density)}" for i in range(count)]
+            return "\n".join(lines)
+        case _:
+            return _words(rng, rng.randint(20, 120), density)
+
+
+def _block(rng: random.Random, spec: CorpusSpec) -> str:
+    match spec.kind:
+        case "mixed":
+            return _mixed_block(rng, spec)
+        case "many-links":
+            links = [f"[{rng.choice(WORDS)}](/{i})" for i in range(50)]
+            return " ".join(links)
+        case "long-lists":
+            return "\n".join(
+                f"* {_words(rng, 6, spec.inline_density)}" for _ in range(500)
+            )
+        case "deep-lists":
+            lines = [
+                f"{'  ' * (i % 20)}* {_words(rng, 6, spec.inline_density)}"
+                for i in range(200)
+            ]
+            return "\n".join(lines)
+        case "long-paragraphs":
+            return _words(rng, 5000, spec.inline_density)
+        case _:
+            raise ValueError(f"Unknown corpus kind {spec.kind}")
+
+
+KINDS = ("mixed", "many-links", "long-lists", "deep-lists", "long-paragraphs")
+
+
+def generate_page(rng: random.Random, spec: CorpusSpec, number: int) -> str:
+    """Returns the markdown for a single page of the corpus"""
+    blocks = [f"# Page {number}"]
+    blocks.extend(_block(rng, spec) for _ in range(spec.blocks))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(content_dir: str, spec: CorpusSpec) -> int:
+    """
+    Writes `spec.pages` markdown files into `content_dir`, spread over directories
+    nested up to `spec.depth` levels deep. Returns the total size of the corpus in bytes.
+    """
+    rng = random.Random(spec.seed)
+    total_size = 0
+
+    for number in range(spec.pages):
+        dirs = [f"section{rng.randrange(4)}" for _ in range(rng.randint(0, spec.depth))]
+        page_dir = path.join(content_dir, *dirs)
+        makedirs(page_dir, exist_ok=True)
+
+        markdown = generate_page(rng, spec, number)
+        with open(path.join(page_dir, f"page{number}.md"), "w", encoding="utf-8") as f:
+            f.write(markdown)
+        total_size += len(markdown.encode("utf-8"))
+
+    return total_size
+
+
+def main():
+    """Generates a corpus from the command line"""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("output_dir")
+    parser.add_argument("--kind", choices=KINDS, default=DEFAULT_SPEC.kind)
+    parser.add_argument("--pages", type=int, default=DEFAULT_SPEC.pages)
+    parser.add_argument("--depth", type=int, default=DEFAULT_SPEC.depth)
+    parser.add_argument("--blocks", type=int, default=DEFAULT_SPEC.blocks)
+    parser.add_argument(
+        "--inline-density", type=float, default=DEFAULT_SPEC.inline_density
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SPEC.seed)
+    args = parser.parse_args()
+
+    spec = CorpusSpec(
+        args.kind, args.pages, args.depth, args.blocks, args.inline_density, args.seed
+    )
+    size = generate_corpus(args.output_dir, spec)
+    print(f"Wrote {spec.pages} pages ({size / 1e6:.1f} MB) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
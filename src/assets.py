@@ -0,0 +1,210 @@
+"""
+Provides content-hashed copies of static assets, such as `index.3f9a1c2b.css`,
+and the mapping used to point pages and templates at them, so that assets
+can be served with far-future cache lifetimes without ever going stale
+"""
+
+import json
+import posixpath
+import re
+from copy import copy
+from os import link, path, remove, sep
+from shutil import copy2
+from typing import Iterable
+
+from image_size import IMAGE_EXTENSIONS, read_image_size
+from manifest import BuildManifest, hash_bytes, hash_file
+from output import write_if_changed
+
+# The number of hex digits of an asset's hash included in its fingerprinted name
+FINGERPRINT_LENGTH = 8
+# The name of the asset manifest written to the output directory
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+URL_PATTERN = re.compile(r"([^?#]*)(.*)", re.DOTALL)
+SCHEME_PATTERN = re.compile(r"[A-Za-z][\w+.-]*:")
+# Captures the target of every markdown link and image, along with any other text
+# that looks like one, such as the target of a link inside a code span
+LINK_TARGET_PATTERN = re.compile(r"(?=\]\(([^)\n]*)\))")
+
+
+class AssetMap:
+    """
+    Maps the url of each static asset in `root` to the url of its fingerprinted copy.
+    Relative urls are resolved against `base`, the url of the directory of the page
+    being rendered, and are left alone if there is no `base`.
+    `sizes` holds the (width, height) of each image asset, by its url.
+    """
+
+    def __init__(
+        self,
+        urls: dict[str, str] | None = None,
+        root: str = "",
+        base: str | None = None,
+        sizes: dict[str, tuple[int, int]] | None = None,
+    ):
+        self.urls = urls if urls is not None else {}
+        self.root = root
+        self.base = base
+        self.sizes = sizes if sizes is not None else {}
+        self.digest = (
+            hash_bytes(
+                json.dumps(
+                    [sorted(self.urls.items()), sorted(self.sizes.items())]
+                ).encode("utf-8")
+            )
+            if self.urls
+            else ""
+        )
+
+    @classmethod
+    def from_manifest(cls, manifest: BuildManifest, root: str) -> "AssetMap":
+        """Returns the map of the fingerprinted assets recorded in `manifest`"""
+        urls = {}
+        sizes = {}
+        for dst_path, entry in manifest.assets.items():
+            if "fingerprint" in entry:
+                urls[file_url(dst_path, root)] = file_url(entry["fingerprint"], root)
+            if "width" in entry:
+                sizes[file_url(dst_path, root)] = (entry["width"], entry["height"])
+        return cls(urls, root, sizes=sizes)
+
+    def for_page(self, dst_path: str) -> "AssetMap":
+        """Returns this map resolving relative urls from the page at `dst_path`"""
+        page = copy(self)
+        page.base = posixpath.dirname(file_url(dst_path, self.root)).rstrip("/") + "/"
+        return page
+
+    def _asset_url(self, url: str) -> tuple[str, str] | None:
+        """Splits `url` into the absolute url of the asset it may refer to, and the rest"""
+        url_path, suffix = URL_PATTERN.match(url).groups()
+        if not url_path or SCHEME_PATTERN.match(url_path):
+            return None
+        if not url_path.startswith("/"):
+            if self.base is None:
+                return None
+            url_path = posixpath.normpath(posixpath.join(self.base, url_path))
+        return url_path, suffix
+
+    def resolve(self, url: str) -> str:
+        """Returns the url of the fingerprinted copy of the asset at `url`, if any"""
+        asset_url = self._asset_url(url) if self.urls else None
+        if asset_url is None:
+            return url
+
+        fingerprinted = self.urls.get(asset_url[0])
+        return fingerprinted + asset_url[1] if fingerprinted else url
+
+    def size(self, url: str) -> tuple[int, int] | None:
+        """Returns the (width, height) of the image at `url`, if it is a known asset"""
+        asset_url = self._asset_url(url) if self.sizes else None
+        if asset_url is None:
+            return None
+        return self.sizes.get(asset_url[0])
+
+    def referenced(self, markdown: str) -> list[str]:
+        """
+        Returns the absolute urls of the local files that the links and images in
+        `markdown` may point at, whether or not they are assets in this map
+        """
+        urls = set()
+        for target in LINK_TARGET_PATTERN.findall(markdown):
+            asset_url = self._asset_url(target)
+            if asset_url is not None:
+                urls.add(asset_url[0])
+        return sorted(urls)
+
+    def digest_of(self, urls: Iterable[str]) -> str:
+        """
+        Returns a digest of the fingerprinted copies and sizes of the assets at `urls`,
+        which is empty if none of them are assets
+        """
+        assets = [
+            (url, self.urls[url], self.sizes.get(url))
+            for url in urls
+            if url in self.urls
+        ]
+        return hash_bytes(json.dumps(assets).encode("utf-8")) if assets else ""
+
+    def key(self, markdown: str) -> str:
+        """
+        Returns the part of a cache key that identifies how this map renders `markdown`,
+        which only changes with the assets that `markdown` links to
+        """
+        if not self.urls:
+            return ""
+        return self.digest_of(self.referenced(markdown))
+
+
+def file_url(file_path: str, root: str) -> str:
+    """Returns the url of the file at `file_path` when `root` is served at `/`"""
+    return "/" + path.relpath(file_path, root).replace(sep, "/")
+
+
+def fingerprinted_path(file_path: str, file_hash: str) -> str:
+    """Returns the path of the copy of `file_path` named after its hash"""
+    stem, extension = path.splitext(file_path)
+    return f"{stem}.{file_hash[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def fingerprint_assets(
+    manifest: BuildManifest, previous_assets: dict, root: str
+) -> AssetMap:
+    """
+    Creates a fingerprinted copy of every asset in `manifest.assets` and writes the
+    asset manifest to `root`. Assets are only hashed again if their size or modification
+    time differs from their entry in `previous_assets`, and fingerprinted copies of
+    assets that have since changed or been deleted are removed.
+    The dimensions of each image are recorded in its entry, and are only read from
+    the image if no previous asset had the same hash.
+    """
+    image_sizes = {
+        entry["hash"]: (entry["width"], entry["height"])
+        for entry in previous_assets.values()
+        if "width" in entry
+    }
+
+    for dst_path, entry in manifest.assets.items():
+        previous = previous_assets.get(dst_path, {})
+        if (
+            "hash" in previous
+            and previous["size"] == entry["size"]
+            and previous["mtime"] == entry["mtime"]
+        ):
+            entry["hash"] = previous["hash"]
+        else:
+            entry["hash"] = hash_file(dst_path)
+
+        entry["fingerprint"] = fingerprinted_path(dst_path, entry["hash"])
+        if not path.exists(entry["fingerprint"]):
+            _link_or_copy(dst_path, entry["fingerprint"])
+
+        if path.splitext(dst_path)[1].lower() in IMAGE_EXTENSIONS:
+            if entry["hash"] not in image_sizes:
+                image_sizes[entry["hash"]] = read_image_size(dst_path)
+            if image_sizes[entry["hash"]]:
+                entry["width"], entry["height"] = image_sizes[entry["hash"]]
+
+    fingerprints = {entry["fingerprint"] for entry in manifest.assets.values()}
+    for entry in previous_assets.values():
+        old_fingerprint = entry.get("fingerprint")
+        if (
+            old_fingerprint
+            and old_fingerprint not in fingerprints
+            and path.exists(old_fingerprint)
+        ):
+            remove(old_fingerprint)
+
+    asset_map = AssetMap.from_manifest(manifest, root)
+    write_if_changed(
+        path.join(root, ASSET_MANIFEST_NAME),
+        [json.dumps(asset_map.urls, indent=2, sort_keys=True), "\n"],
+    )
+    return asset_map
+
+
+def _link_or_copy(src_path: str, dst_path: str):
+    try:
+        link(src_path, dst_path)
+    except OSError:
+        copy2(src_path, dst_path)
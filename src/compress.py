@@ -0,0 +1,99 @@
+"""
+Provides precompressed `.gz` sidecars for the text files in the output directory,
+so that a static server can send them without compressing on each request
+"""
+
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count, getpid, path, remove, replace, stat, utime
+
+from manifest import BuildManifest
+
+# Files smaller than this, in bytes, are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_EXTENSIONS = frozenset(
+    (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map")
+)
+
+
+def sidecar_path(file_path: str) -> str:
+    """Returns the path of the compressed sidecar of `file_path`"""
+    return f"{file_path}.gz"
+
+
+def is_compressible(file_path: str) -> bool:
+    """Returns `True` if `file_path` is a text file that should have a sidecar"""
+    return path.splitext(file_path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compress_file(file_path: str, mtime_ns: int):
+    """
+    Writes the gzip sidecar of `file_path`, giving it the modification time `mtime_ns`
+    of the file it was compressed from so that stale sidecars can be detected
+    """
+    with open(file_path, "rb") as file:
+        data = file.read()
+
+    gz_path = sidecar_path(file_path)
+    tmp_path = f"{gz_path}.{getpid()}.tmp"
+    with open(tmp_path, "wb") as gz_file:
+        gz_file.write(gzip.compress(data, compresslevel=9, mtime=0))
+    utime(tmp_path, ns=(mtime_ns, mtime_ns))
+    replace(tmp_path, gz_path)
+
+
+def remove_sidecars(manifest: BuildManifest):
+    """Removes every sidecar recorded in `manifest`, so that none can go stale"""
+    for file_path in manifest.compressed:
+        if path.exists(sidecar_path(file_path)):
+            remove(sidecar_path(file_path))
+    manifest.compressed = []
+
+
+def compress_outputs(
+    manifest: BuildManifest,
+    threads: int = 0,
+    min_size: int = MIN_COMPRESS_SIZE,
+) -> list[str]:
+    """
+    Compresses every compressible page and asset recorded in `manifest` that is at least
+    `min_size` bytes and whose sidecar is missing or older than it, using `threads`
+    threads (0 uses one per core). Sidecars of outputs that no longer exist or have
+    become too small are removed. Returns the paths of the files that were compressed.
+    """
+    outputs = [entry["output_path"] for entry in manifest.pages.values()]
+    for dst_path, entry in manifest.assets.items():
+        outputs.append(dst_path)
+        if "fingerprint" in entry:
+            outputs.append(entry["fingerprint"])
+
+    compressed = set()
+    pending = []
+    for file_path in outputs:
+        if not is_compressible(file_path):
+            continue
+        try:
+            file_stat = stat(file_path)
+        except FileNotFoundError:
+            continue
+        if file_stat.st_size < min_size:
+            continue
+
+        compressed.add(file_path)
+        try:
+            current = stat(sidecar_path(file_path)).st_mtime_ns == file_stat.st_mtime_ns
+        except FileNotFoundError:
+            current = False
+        if not current:
+            pending.append((file_path, file_stat.st_mtime_ns))
+
+    for file_path in manifest.compressed:
+        if file_path not in compressed and path.exists(sidecar_path(file_path)):
+            remove(sidecar_path(file_path))
+    manifest.compressed = sorted(compressed)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=threads or cpu_count() or 1) as executor:
+            list(executor.map(lambda item: compress_file(*item), pending))
+
+    return [file_path for file_path, _ in pending]
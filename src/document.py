@@ -0,0 +1,162 @@
+"""
+Provides a parsed representation of a whole markdown page, so that later build
+stages can use its blocks, html, title and outline without parsing it again
+"""
+
+import re
+from typing import Iterator, NamedTuple
+
+from assets import AssetMap
+from htmlnode import ParentNode
+from markdown_blocks import (
+    Block,
+    BlockType,
+    block_to_html_node,
+    iter_blocks,
+    render_block,
+)
+from profiling import PROFILER
+
+# Bump whenever a change to the parser changes the html produced for a document
+PARSER_VERSION = 5
+
+SLUG_PATTERN = re.compile(r"[^\w\- ]")
+
+
+class Heading(NamedTuple):
+    """A heading in a document's outline"""
+
+    level: int
+    text: str
+
+
+class Section(NamedTuple):
+    """
+    The plain text of a document from one heading up to the next, with the heading's
+    anchor. The text before the first heading has no anchor or heading.
+    """
+
+    anchor: str | None
+    heading: str | None
+    text: str
+
+
+class Document:
+    """
+    A markdown document that has been parsed once by `parse_document`.
+    `sections` is `None` if the plain text of its sections was not collected.
+    """
+
+    def __init__(
+        self,
+        blocks: list[Block],
+        html_node: ParentNode,
+        title: str | None,
+        outline: list[Heading],
+        sections: list[Section] | None = None,
+        links: list[str] | None = None,
+        anchors: list[str] | None = None,
+    ):
+        self.blocks = blocks
+        self.html_node = html_node
+        self.title = title
+        self.outline = outline
+        self.sections = sections
+        self.links = links if links is not None else []
+        self.anchors = anchors if anchors is not None else []
+
+    def __repr__(self):
+        return f"Document(title={repr(self.title)}, blocks={len(self.blocks)})"
+
+    def iter_html(self) -> Iterator[str]:
+        """Yields the document's html in chunks"""
+        return self.html_node.iter_html()
+
+
+def parse_document(
+    markdown: str, assets: AssetMap | None = None, sections: bool = False
+) -> Document:
+    """
+    Parses a markdown document once into its blocks and html,
+    collecting its headings, their anchors and the urls of its links and images
+    from the parsed blocks, and the plain text of each section if `sections` is `True`.
+    Each heading is given an `id` anchor that is unique within the document.
+    Links and images to assets in `assets` point at their fingerprinted copies.
+    The title is the first h1 heading, or `None` if the document has no h1 heading.
+    """
+    with PROFILER.stage("blocks"):
+        blocks = list(iter_blocks(markdown))
+    with PROFILER.stage("inline"):
+        nodes = [
+            (
+                block_to_html_node(block, assets)
+                if block.block_type == BlockType.Heading
+                else render_block(block, assets)
+            )
+            for block in blocks
+        ]
+    PROFILER.count("blocks", len(blocks))
+
+    outline = []
+    title = None
+    anchors = []
+    taken = set()
+    section_texts = []
+    section = Section(None, None, [])
+
+    for block, node in zip(blocks, nodes):
+        if block.block_type != BlockType.Heading:
+            if sections:
+                text = node.text_content()
+                if text:
+                    section.text.append(text)
+            continue
+
+        hashes, text = block.text.split(" ", 1)
+        outline.append(Heading(len(hashes), text))
+        if title is None and len(hashes) == 1:
+            title = text
+
+        heading = node.text_content()
+        anchor = slugify(heading, taken)
+        node.props = {"id": anchor}
+        anchors.append(anchor)
+        section_texts.append(section)
+        section = Section(anchor, heading, [])
+
+    document_sections = None
+    if sections:
+        section_texts.append(section)
+        document_sections = [
+            Section(anchor, heading, "\n".join(text))
+            for anchor, heading, text in section_texts
+            if anchor is not None or text
+        ]
+
+    links = [url for node in nodes for url in node.links()]
+
+    return Document(
+        blocks,
+        ParentNode("div", nodes),
+        title,
+        outline,
+        document_sections,
+        links,
+        anchors,
+    )
+
+
+def slugify(text: str, taken: set[str]) -> str:
+    """
+    Returns an anchor for a heading with the plain text `text`, adding a number
+    if it is already in `taken`, then adds the anchor to `taken`
+    """
+    slug = "-".join(SLUG_PATTERN.sub("", text.lower()).split()) or "section"
+    anchor = slug
+    number = 1
+    while anchor in taken:
+        anchor = f"{slug}-{number}"
+        number += 1
+
+    taken.add(anchor)
+    return anchor
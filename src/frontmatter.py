@@ -0,0 +1,202 @@
+"""
+Provides optional front matter at the top of markdown pages, either YAML-style
+between `---` lines or TOML-style between `+++` lines, and a cache of each page's
+metadata that is read from the header of the file alone, so that listings of pages
+can be built without reading or parsing their bodies
+"""
+
+import re
+from itertools import chain
+from os import stat
+
+from markdown_blocks import find_title, iter_blocks_from_lines
+from output import load_state, save_state
+
+# Each fence and the separator between keys and values in the front matter it opens
+FENCES = {"---": ":", "+++": "="}
+FRONT_MATTER_PATTERN = re.compile(
+    r"(---|\+\+\+)[ \t]*\r?\n(.*?)^\1[ \t]*(?:\r?\n|\Z)", re.DOTALL | re.MULTILINE
+)
+KEY_PATTERN = re.compile(r"[A-Za-z_][\w-]*")
+# Matches the items of an inline list, which may be quoted to contain commas
+ITEM_PATTERN = re.compile(r"""\s*("[^"]*"|'[^']*'|[^,\s][^,]*)""")
+
+Metadata = dict[str, str | int | float | bool | list]
+
+
+def split_front_matter(markdown: str) -> tuple[Metadata, str]:
+    """
+    Returns the metadata in the front matter at the start of `markdown`,
+    and the rest of the document. Documents without front matter have no metadata.
+    Raises a `ValueError` if the front matter is malformed.
+    """
+    if not markdown.startswith(tuple(FENCES)):
+        return {}, markdown
+
+    match = FRONT_MATTER_PATTERN.match(markdown)
+    if match is None:
+        if markdown.partition("\n")[0].rstrip() in FENCES:
+            raise ValueError("Front matter is not closed")
+        return {}, markdown
+
+    fence, header = match.groups()
+    return parse_front_matter(header.splitlines(), fence), markdown[match.end() :]
+
+
+def parse_front_matter(lines: list[str], fence: str = "---") -> Metadata:
+    """
+    Parses the lines of front matter opened by `fence`. Values may be strings, quoted
+    or not, integers, floats, `true` or `false`, or lists of them, either inline
+    in brackets or, in YAML-style front matter, on the following `- item` lines.
+    """
+    separator = FENCES[fence]
+    metadata = {}
+    list_key = None
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if list_key is not None and stripped.startswith("- "):
+            metadata[list_key].append(_parse_value(stripped[2:]))
+            continue
+
+        key, found, value = stripped.partition(separator)
+        key = key.strip()
+        if not found or not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid front matter line: {line!r}")
+
+        value = value.strip()
+        if not value and separator == ":":
+            metadata[key] = []
+            list_key = key
+        else:
+            metadata[key] = _parse_value(value)
+            list_key = None
+
+    return metadata
+
+
+def _parse_value(text: str) -> str | int | float | bool | list:
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_parse_value(item) for item in ITEM_PATTERN.findall(text[1:-1])]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+
+    for parse in (int, float):
+        try:
+            return parse(text)
+        except ValueError:
+            pass
+    return text
+
+
+def read_metadata(file_path: str) -> Metadata:
+    """
+    Returns the front matter of the markdown file at `file_path`, reading no further
+    than its end. If it has no `title`, the title is taken from the first h1 heading
+    found by the same block scanner that parses pages, and the file is read no further
+    than the block of that heading.
+    """
+    with open(file_path, "r", encoding="utf-8") as md_file:
+        line = md_file.readline()
+        metadata = {}
+
+        fence = line.rstrip()
+        if fence in FENCES:
+            header = []
+            for line in md_file:
+                if line.rstrip() == fence:
+                    break
+                header.append(line)
+            else:
+                raise ValueError(f"Front matter is not closed in {file_path}")
+            metadata = parse_front_matter(header, fence)
+            line = md_file.readline()
+
+        if "title" in metadata:
+            return metadata
+
+        lines = (line.rstrip("\n") for line in chain([line], md_file))
+        title = find_title(iter_blocks_from_lines(lines))
+        if title is not None:
+            metadata["title"] = title
+
+    return metadata
+
+
+class MetadataCache:
+    """
+    The metadata of each markdown file, read with `read_metadata` and kept in the state
+    file at `state_path` along with the modification time and size of the file, so that
+    a file is only read again once it changes
+    """
+
+    VERSION = 2
+
+    def __init__(self, state_path: str | None = None, entries: dict | None = None):
+        self.state_path = state_path
+        self.entries = entries if entries is not None else {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, state_path: str) -> "MetadataCache":
+        """
+        Loads the cache saved at `state_path`.
+        Returns an empty cache if `load_state` finds no usable state there.
+        """
+        data = load_state(state_path, cls.VERSION)
+        if data is None:
+            return cls(state_path)
+
+        return cls(state_path, data["entries"])
+
+    def get(self, src_path: str, check: bool = True) -> Metadata:
+        """
+        Returns the metadata of the file at `src_path`, reading it if it has changed.
+        If `check` is `False`, cached metadata is returned without looking at the file.
+        """
+        entry = self.entries.get(src_path)
+        if not check and entry is not None:
+            self.hits += 1
+            return entry["metadata"]
+
+        file_stat = stat(src_path)
+        if (
+            entry is not None
+            and entry["mtime"] == file_stat.st_mtime_ns
+            and entry["size"] == file_stat.st_size
+        ):
+            self.hits += 1
+            return entry["metadata"]
+
+        self.misses += 1
+        metadata = read_metadata(src_path)
+        self.entries[src_path] = {
+            "mtime": file_stat.st_mtime_ns,
+            "size": file_stat.st_size,
+            "metadata": metadata,
+        }
+        return metadata
+
+    def retain(self, src_paths: set[str]) -> int:
+        """Forgets every file whose path is not in `src_paths`, returning how many"""
+        count = len(self.entries)
+        self.entries = {
+            src_path: entry
+            for src_path, entry in self.entries.items()
+            if src_path in src_paths
+        }
+        return count - len(self.entries)
+
+    def save(self):
+        """Writes the cache to `self.state_path`"""
+        if not self.state_path:
+            return
+
+        save_state(self.state_path, self.VERSION, {"entries": self.entries})
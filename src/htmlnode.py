@@ -3,10 +3,30 @@ Provides intermediate representation for html documents as an abstract syntax tr
 and allows converting to proper html
 """
 
+from sys import intern
+from typing import Iterator, TextIO
+
+# The entity for each character that cannot appear as is in html text or
+# double-quoted attribute values, with `&` first so entities are not escaped again
+ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"))
+
+
+def escape(text: str) -> str:
+    """
+    Returns `text` with each character in `ESCAPES` replaced by its entity.
+    Most text has none of them, so it is returned as is without being copied.
+    """
+    if "&" in text or "<" in text or ">" in text or '"' in text:
+        for char, entity in ESCAPES:
+            text = text.replace(char, entity)
+    return text
+
 
 class HTMLNode:
     """Abstract parent class for intermediate representation of html nodes"""
 
+    __slots__ = ("tag", "value", "props", "children")
+
     def __init__(
         self,
         tag: str | None = None,
@@ -14,7 +34,7 @@ class HTMLNode:
         props: dict | None = None,
         children: list | None = None,
     ):
-        self.tag = tag
+        self.tag = intern(tag) if tag else tag
         self.value = value
         self.props = props
         self.children = children
@@ -23,10 +43,41 @@ class HTMLNode:
         return f"HTMLNode(tag={repr(self.tag)}, \
 value={repr(self.value)}, children={repr(self.children)}, props={repr(self.props)})"
 
-    def to_html(self):
+    def to_html(self) -> str:
+        """Converts `self` to a string of html"""
+        return "".join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
         """Placeholder method to be overridden by child classes"""
         raise NotImplementedError
 
+    def text_content(self) -> str:
+        """
+        Returns the text of `self` and its descendants without any html.
+        Children that themselves have children, such as list items, are separated
+        by newlines.
+        """
+        if not self.children:
+            return self.value or ""
+
+        separator = "\n" if all(child.children for child in self.children) else ""
+        return separator.join(child.text_content() for child in self.children)
+
+    def links(self) -> list[str]:
+        """Returns the `href` and `src` urls of `self` and its descendants, in order"""
+        urls = [
+            self.props[name]
+            for name in ("href", "src")
+            if self.props and name in self.props
+        ]
+        for child in self.children or ():
+            urls.extend(child.links())
+        return urls
+
+    def write_html(self, file: TextIO):
+        """Writes `self` as html to `file` without building the full string in memory"""
+        file.writelines(self.iter_html())
+
     def props_to_html(self) -> str | None:
         """Converts `self.props` to a string for use html tag output"""
         if not self.props:
@@ -35,7 +86,7 @@ value={repr(self.value)}, children={repr(self.children)}, props={repr(self.props
         html_props = ""
 
         for key, value in self.props.items():
-            html_props += f' {key}="{value}"'
+            html_props += f' {key}="{escape(str(value))}"'
 
         return html_props
 
@@ -43,24 +94,28 @@ value={repr(self.value)}, children={repr(self.children)}, props={repr(self.props
 class LeafNode(HTMLNode):
     """
     Class for html node that has no children.
-    Note: `LeafNode`s must have a `value` attribute that is not `None`
+    Note: `LeafNode`s must have a `value` attribute that is not `None`,
+        which is escaped when output
     """
 
+    __slots__ = ()
+
     def __init__(self, tag: str | None, value: str, props: dict | None = None):
         super().__init__(tag, value, props)
 
-    def to_html(self) -> str:
+    def iter_html(self) -> Iterator[str]:
         if (self.value != "") and not self.value:
             raise ValueError("LeafNode must have a value")
         if not self.tag:
-            return self.value
+            yield escape(self.value)
+            return
 
         if self.props:
             html_props = self.props_to_html()
         else:
             html_props = ""
 
-        return f"<{self.tag}{html_props}>{self.value}</{self.tag}>"
+        yield f"<{self.tag}{html_props}>{escape(self.value)}</{self.tag}>"
 
 
 class ParentNode(HTMLNode):
@@ -70,10 +125,12 @@ class ParentNode(HTMLNode):
         and a `children` list that is not `None` or empty
     """
 
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict | None = None):
         super().__init__(tag, value=None, children=children, props=props)
 
-    def to_html(self) -> str:
+    def iter_html(self) -> Iterator[str]:
         if not self.tag:
             raise ValueError("ParentNode must have a tag")
         if not self.children:
@@ -84,11 +141,31 @@ class ParentNode(HTMLNode):
         else:
             html_props = ""
 
-        opening_tag = f"<{self.tag}{html_props}>"
-        closing_tag = f"</{self.tag}>"
-
-        children = ""
+        yield f"<{self.tag}{html_props}>"
         for child in self.children:
-            children += child.to_html()
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
+
+
+class RawNode(HTMLNode):
+    """
+    Class for html that has already been rendered, such as a memoized block,
+    along with the plain `text` and the link `urls` it contains.
+    Note: the `value` of a `RawNode` is output as is, without being escaped
+    """
+
+    __slots__ = ("text", "urls")
+
+    def __init__(self, html: str, text: str = "", urls: tuple[str, ...] = ()):
+        super().__init__(value=html)
+        self.text = text
+        self.urls = urls
+
+    def iter_html(self) -> Iterator[str]:
+        yield self.value
+
+    def text_content(self) -> str:
+        return self.text
 
-        return f"{opening_tag}{children}{closing_tag}"
+    def links(self) -> list[str]:
+        return list(self.urls)
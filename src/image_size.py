@@ -0,0 +1,83 @@
+"""
+Provides the intrinsic dimensions of PNG, GIF, JPEG and WebP images,
+read from their headers without decoding the image data
+"""
+
+import struct
+from typing import BinaryIO
+
+# The number of bytes that hold the dimensions of every supported format except JPEG
+HEADER_SIZE = 32
+IMAGE_EXTENSIONS = frozenset((".png", ".gif", ".jpg", ".jpeg", ".webp"))
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start of frame markers, which hold the image's dimensions
+JPEG_FRAME_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+)
+
+
+def read_image_size(file_path: str) -> tuple[int, int] | None:
+    """
+    Returns the (width, height) of the image at `file_path`,
+    or `None` if it is not a PNG, GIF, JPEG or WebP image with a valid header
+    """
+    with open(file_path, "rb") as image_file:
+        header = image_file.read(HEADER_SIZE)
+        try:
+            if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+                return struct.unpack(">II", header[16:24])
+            if header[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", header[6:10])
+            if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+                return _webp_size(header)
+            if header[:2] == b"\xff\xd8":
+                image_file.seek(2)
+                return _jpeg_size(image_file)
+        except (struct.error, IndexError):
+            return None
+
+    return None
+
+
+def _webp_size(header: bytes) -> tuple[int, int] | None:
+    match header[12:16]:
+        case b"VP8 ":
+            width, height = struct.unpack("<HH", header[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        case b"VP8L":
+            if header[20] != 0x2F:
+                return None
+            bits = int.from_bytes(header[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        case b"VP8X":
+            width = int.from_bytes(header[24:27], "little") + 1
+            height = int.from_bytes(header[27:30], "little") + 1
+            return width, height
+        case _:
+            return None
+
+
+def _jpeg_size(image_file: BinaryIO) -> tuple[int, int] | None:
+    """Skips from segment to segment until the start of frame marker"""
+    while True:
+        marker = image_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+
+        # markers may be padded with any number of 0xff bytes
+        while marker[1] == 0xFF:
+            marker = marker[1:] + image_file.read(1)
+            if len(marker) < 2:
+                return None
+
+        # standalone markers have no length
+        if marker[1] == 0x01 or 0xD0 <= marker[1] <= 0xD7:
+            continue
+
+        (length,) = struct.unpack(">H", image_file.read(2))
+        if marker[1] in JPEG_FRAME_MARKERS:
+            height, width = struct.unpack(">xHH", image_file.read(5))
+            return width, height
+
+        image_file.seek(length - 2, 1)
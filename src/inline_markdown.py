@@ -7,31 +7,75 @@ import re
 
 from textnode import TextNode, TextType
 
+SPAN_PATTERN = re.compile(
+    r"!\[(.*?)\]\((.*?)\)"
+    r"|\[(.*?)\]\((.*?)\)"
+    r"|`([^`]+)`"
+)
+
+EMPHASIS_PATTERN = re.compile(
+    r"\*\*((?s:.+?))\*\*"
+    r"|__((?s:.+?))__"
+    r"|\*((?s:.+?))\*"
+    r"|_((?s:.+?))_"
+)
+
+# The `TextType` produced by `SPAN_PATTERN` for a match, indexed by `match.lastindex`
+SPAN_TYPES = (None, None, TextType.Image, None, TextType.Link, TextType.Code)
+
+# The `TextType` produced by `EMPHASIS_PATTERN` for a match, indexed by `match.lastindex`
+EMPHASIS_TYPES = (None, TextType.Bold, TextType.Bold, TextType.Italic, TextType.Italic)
+
 
 def text_to_textnodes(text: str) -> list[TextNode]:
     """
     Converts a given text to string to `TextNode` intermediate representation
-    to allow for conversion to html
+    to allow for conversion to html.
+    Images, links and code are found in a single left-to-right scan, and bold and
+    italic text only in the text between them, so that a delimiter can never start
+    emphasis that runs into a link, image or code span.
     """
-    nodes = [TextNode(text, TextType.Normal)]
+    nodes = []
+    position = 0
+
+    for match in SPAN_PATTERN.finditer(text):
+        split_emphasis(nodes, text, position, match.start())
+        position = match.end()
 
-    delimiter_types = [
-        ("`", TextType.Code),
-        ("**", TextType.Bold),
-        ("__", TextType.Bold),
-        ("*", TextType.Italic),
-        ("_", TextType.Italic),
-    ]
+        index = match.lastindex
+        text_type = SPAN_TYPES[index]
+        if text_type in (TextType.Image, TextType.Link):
+            nodes.append(TextNode(match[index - 1], text_type, match[index]))
+        else:
+            nodes.append(TextNode(match[index], text_type))
 
-    nodes = split_nodes_links(nodes)
-    nodes = split_nodes_images(nodes)
+    split_emphasis(nodes, text, position, len(text))
 
-    for delimiter, text_type in delimiter_types:
-        nodes = split_nodes(nodes, delimiter, text_type)
+    if not nodes:
+        return [TextNode(text, TextType.Normal)]
 
     return nodes
 
 
+def split_emphasis(nodes: list[TextNode], text: str, start: int, end: int):
+    """
+    Appends `text[start:end]` to `nodes`, with bold and italic text separated into
+    their own nodes
+    """
+    position = start
+
+    for match in EMPHASIS_PATTERN.finditer(text, start, end):
+        if match.start() > position:
+            nodes.append(TextNode(text[position : match.start()], TextType.Normal))
+        position = match.end()
+
+        index = match.lastindex
+        nodes.append(TextNode(match[index], EMPHASIS_TYPES[index]))
+
+    if end > position:
+        nodes.append(TextNode(text[position:end], TextType.Normal))
+
+
 def split_nodes(
     nodes: list[TextNode], delimiter: str, text_type: TextType
 ) -> list[TextNode]:
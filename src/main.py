@@ -5,74 +5,793 @@ This package was created as part of the author's completion of Boot.dev's
 backend developer course.
 """
 
-from os import curdir, listdir, makedirs, mkdir, path
+import cProfile
+import json
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor
+from os import DirEntry, cpu_count, curdir, makedirs, path, remove, stat_result
 from shutil import copy, rmtree
+from time import perf_counter
+from typing import Iterator, NamedTuple
 
-from markdown_blocks import extract_title, markdown_to_html_node
+from assets import AssetMap, file_url, fingerprint_assets
+from compress import compress_outputs, remove_sidecars
+from document import PARSER_VERSION, Section, parse_document
+from frontmatter import MetadataCache, split_front_matter
+from htmlnode import escape
+from linkcheck import BrokenLinksError, check_links
+from manifest import BuildManifest, hash_bytes
+from output import write_if_changed
+from parse_cache import DEFAULT_MAX_BYTES, ParseCache
+from profiling import PROFILER
+from search import SearchIndex, remove_index
+from sync import sync_dir
+from template import LAYOUT_NAME, Layouts, Template
+from walk import scan_tree
+from watch import Changes, ReloadNotifier, Watcher, serve
 
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+PUBLIC_DIR = "public"
+TEMPLATE_PATH = "template.html"
+MANIFEST_PATH = path.join(".sitegen", "manifest.json")
+CACHE_DIR = path.join(".sitegen", "cache")
+SEARCH_STATE_PATH = path.join(".sitegen", "search.json")
+SEARCH_DIR = path.join(PUBLIC_DIR, "search")
+METADATA_PATH = path.join(".sitegen", "metadata.json")
+LISTING_PATH = path.join(PUBLIC_DIR, "pages.json")
 
-def main():
+
+class PageGenerationError(Exception):
+    """Raised when a page cannot be generated, recording the source that failed"""
+
+    def __init__(self, src_path: str, reason: str):
+        super().__init__(src_path, reason)
+        self.src_path = src_path
+        self.reason = reason
+
+    def __str__(self):
+        return f"Failed to generate page from {self.src_path}: {self.reason}"
+
+
+class GeneratedPage(NamedTuple):
+    """
+    A page written by `generate_page`, with the title and text used to index it,
+    the urls of its links and images, the anchors of its headings, and the urls of the
+    local files its markdown links to, some of which may be assets.
+    `sections` is `None` unless the page was generated for a search index.
+    """
+
+    src_path: str
+    dst_path: str
+    changed: bool
+    title: str
+    sections: list[Section] | None
+    links: list[str]
+    anchors: list[str]
+    asset_urls: list[str]
+
+
+def main(argv: list[str] | None = None):
     """Entry point for `sitegen`"""
+    parser = ArgumentParser(prog="sitegen", description=__doc__)
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["build", "watch"],
+        default="build",
+        help="build the site once, or rebuild it whenever its sources change",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes used to generate pages (0 uses every core)",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=8888,
+        help="port to serve the site on in watch mode",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each stage of page generation and print a breakdown",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages to list when profiling",
+    )
+    parser.add_argument(
+        "--profile-json", metavar="PATH", help="write the profile report as json"
+    )
+    parser.add_argument(
+        "--profile-dump",
+        metavar="PATH",
+        help="write a cProfile dump of the build (worker processes not included)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES >> 20,
+        metavar="MB",
+        help="maximum size of the on-disk parse cache",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="parse every page from scratch"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write a gzip sidecar next to each changed html page and text asset",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help=f"write a sharded full-text search index to {SEARCH_DIR}",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse insignificant whitespace in generated pages",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="fail the build if any page links to a missing page, anchor or asset",
+    )
+    args = parser.parse_args(argv)
+
+    manifest = BuildManifest.load(MANIFEST_PATH)
+    cache = None if args.no_cache else ParseCache(CACHE_DIR, args.cache_size << 20)
+    search = SearchIndex.load(SEARCH_STATE_PATH) if args.search else None
+    try:
+        if args.profile or args.profile_json or args.profile_dump:
+            layouts = profile_build(manifest, cache, args, search)
+        else:
+            layouts = build(
+                manifest,
+                cache,
+                args.jobs,
+                args.compress,
+                search,
+                args.strict,
+                args.minify,
+            )
+    except BrokenLinksError as err:
+        parser.exit(1, f"{err}\n")
+
+    if args.command == "watch":
+        watch_site(manifest, cache, args.port, layouts, args.compress, search)
+
+
+def build(
+    manifest: BuildManifest,
+    cache: ParseCache | None = None,
+    jobs: int = 1,
+    compress: bool = False,
+    search: SearchIndex | None = None,
+    strict: bool = False,
+    minify: bool = False,
+) -> Layouts:
+    """
+    Builds the whole site, skipping anything unchanged since `manifest` was saved
+    and reusing parsed pages from `cache`. If `compress` is `True`, gzip sidecars
+    are written for every output that changed. If a `search` index is given,
+    it is updated with every changed page and written to `SEARCH_DIR`.
+    Broken links are reported once the site is built, and if `strict` is `True`
+    a `BrokenLinksError` is raised after saving the manifest.
+    If `minify` is `True`, the html of every page is minified.
+    Returns the layouts the pages were generated with.
+    """
     print("Generating pages...")
-    copy_static()
-    generate_pages_recursive("content", "public", "template.html")
+    if search is None:
+        remove_search_index()
+    assets = copy_static(manifest)
+
+    layouts = generate_pages_recursive(
+        CONTENT_DIR,
+        PUBLIC_DIR,
+        TEMPLATE_PATH,
+        manifest,
+        jobs=jobs,
+        cache=cache,
+        assets=assets,
+        search=search,
+        minify=minify,
+    )
+    for dst_path in manifest.remove_stale():
+        print(f"Removed stale page {dst_path}")
+    with PROFILER.stage("listing"):
+        write_page_list(manifest)
+    with PROFILER.stage("links"):
+        broken = report_broken_links(manifest, jobs)
+    if search is not None:
+        with PROFILER.stage("search"):
+            write_search_index(search, manifest)
+    if compress:
+        with PROFILER.stage("compress"):
+            compressed = compress_outputs(manifest)
+        PROFILER.count("files compressed", len(compressed))
+    elif manifest.compressed:
+        remove_sidecars(manifest)
+    manifest.save()
+    if cache:
+        cache.evict()
+
+    if strict and broken:
+        raise BrokenLinksError(broken)
     print("Complete!")
+    return layouts
 
 
-def generate_pages_recursive(
-    content_dir_path: str, dst_dir_path: str, template_path: str
+def profile_build(
+    manifest: BuildManifest,
+    cache: ParseCache | None,
+    args: Namespace,
+    search: SearchIndex | None = None,
+) -> Layouts:
+    """Builds the site with profiling enabled, then reports where the time went"""
+    PROFILER.enabled = True
+    profiler = cProfile.Profile() if args.profile_dump else None
+
+    if profiler:
+        profiler.enable()
+    layouts = build(
+        manifest, cache, args.jobs, args.compress, search, args.strict, args.minify
+    )
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile_dump)
+
+    print(PROFILER.report(args.profile_top))
+    if args.profile_json:
+        PROFILER.write_json(args.profile_json, args.profile_top)
+    PROFILER.enabled = False
+    return layouts
+
+
+def watch_site(
+    manifest: BuildManifest,
+    cache: ParseCache | None,
+    port: int,
+    layouts: Layouts,
+    compress: bool = False,
+    search: SearchIndex | None = None,
 ):
+    """
+    Serves the site on `port`, rebuilding the pages and static files affected by each
+    change to the site's sources and reloading any open pages afterwards, starting
+    from the `layouts` of the last build.
+    If `compress` is `True`, the sidecars of changed outputs are rewritten too,
+    and if a `search` index is given, it is updated with the changed pages.
+    """
+    notifier = ReloadNotifier()
+    server = serve(PUBLIC_DIR, port, notifier)
+    watcher = Watcher(watch_paths(layouts))
+    metadata = MetadataCache.load(METADATA_PATH)
+
+    print(f"Serving on http://localhost:{port}, watching for changes...")
+    try:
+        for changes in watcher.poll():
+            start = perf_counter()
+            try:
+                layouts = rebuild(changes, manifest, layouts, cache, search)
+            except (PageGenerationError, ValueError, OSError) as err:
+                print(err)
+                continue
+            watcher.paths = watch_paths(layouts)
+            if search is not None:
+                write_search_index(search, manifest)
+            if compress:
+                compress_outputs(manifest)
+            elif manifest.compressed:
+                remove_sidecars(manifest)
+            manifest.save()
+            notifier.notify()
+            print(f"Rebuilt in {(perf_counter() - start) * 1000:.0f}ms")
+
+            # the listing and link check cover the whole site, so they run once the
+            # rebuilt pages are being served
+            try:
+                write_page_list(manifest, metadata, set(changes.changed))
+                report_broken_links(manifest)
+            except (ValueError, OSError) as err:
+                print(err)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+def watch_paths(layouts: Layouts) -> list[str]:
+    """Returns the paths watch mode polls: the site's sources and every template file"""
+    return [CONTENT_DIR, STATIC_DIR, *sorted(layouts.dependencies)]
+
+
+def rebuild(
+    changes: Changes,
+    manifest: BuildManifest,
+    layouts: Layouts,
+    cache: ParseCache | None = None,
+    search: SearchIndex | None = None,
+) -> Layouts:
+    """
+    Regenerates only the outputs affected by `changes`: the pages whose layout
+    depends on a changed template file or that link to a changed fingerprinted asset,
+    otherwise just the changed pages, and the static files if any changed.
+    The outputs of removed pages are deleted.
+    Returns the layouts, which are recompiled if a template file or the assets changed.
+    """
+    changed = set(changes.changed)
+    sources = changed | set(changes.removed)
+
+    # removed pages are handled first, since a full regeneration never removes pages
+    for src_path in changes.removed:
+        if src_path.endswith(".md") and is_within(src_path, CONTENT_DIR):
+            dst_path = manifest.remove_page(src_path)
+            if dst_path:
+                print(f"Removed stale page {dst_path}")
+
+    assets = layouts.assets
+    if any(is_within(src_path, STATIC_DIR) for src_path in sources):
+        assets = copy_static(manifest)
+
+    dependencies = layouts.dependencies
+    layouts_changed = any(
+        path.normpath(src_path) in dependencies
+        or (path.basename(src_path) == LAYOUT_NAME and is_within(src_path, CONTENT_DIR))
+        for src_path in sources
+    )
+    if layouts_changed or assets.digest != layouts.assets.digest:
+        # pages whose layout and linked assets are unchanged are skipped by the manifest
+        return generate_pages_recursive(
+            CONTENT_DIR,
+            PUBLIC_DIR,
+            TEMPLATE_PATH,
+            manifest,
+            cache=cache,
+            assets=assets,
+            search=search,
+            minify=layouts.minify,
+        )
+
+    pages = [
+        (src_path, page_path(src_path, CONTENT_DIR, PUBLIC_DIR))
+        for src_path in changed
+        if src_path.endswith(".md") and is_within(src_path, CONTENT_DIR)
+    ]
+    for page in generate_pages(
+        pages, layouts, cache=cache, sections=search is not None
+    ):
+        record_page(manifest, layouts, page)
+        if search is not None:
+            search.update(
+                file_url(page.dst_path, PUBLIC_DIR), page.title, page.sections
+            )
+
+    return layouts
+
+
+def generate_pages_recursive(
+    content_dir_path: str,
+    dst_dir_path: str,
+    template_path: str,
+    manifest: BuildManifest | None = None,
+    jobs: int = 1,
+    cache: ParseCache | None = None,
+    assets: AssetMap | None = None,
+    search: SearchIndex | None = None,
+    minify: bool = False,
+) -> Layouts:
     """
     Recursively walks through the directory at `content_dir_path`, generating an html file
-    from each markdown file it finds, and places them all in `dst_dir_path`
+    from each markdown file it finds, and places them all in `dst_dir_path`.
+    Each page uses the `LAYOUT_NAME` template of its directory or nearest parent
+    directory that has one, or else the template at `template_path`.
+    If `assets` are given, urls in the templates and pages point at their fingerprinted
+    copies. If `minify` is `True`, the html of every page is minified.
+    If a `search` index is given, every generated page is indexed, and pages
+    missing from it are generated even if they are unchanged.
+    If a `manifest` is given, pages whose source and compiled layout are unchanged
+    since they were last recorded in it are skipped.
+    When `jobs` is not 1, pages are generated by a pool of `jobs` processes
+    (or one per core if `jobs` is 0).
+    If a `cache` is given, pages whose markdown has been parsed before are not
+    parsed again.
+    Returns the layouts the pages were generated with.
+    """
+    sources = collect_sources(content_dir_path, dst_dir_path)
+    layouts = Layouts.load(template_path, content_dir_path, sources.layout_dirs, minify)
+    if assets:
+        layouts = layouts.with_assets(assets)
+
+    pages = sources.pages
+    if manifest is not None:
+        outputs = collect_outputs(dst_dir_path) if manifest.pages else set()
+        pages = [
+            (src_path, dst_path)
+            for src_path, dst_path in pages
+            if not manifest.is_current(
+                src_path,
+                dst_path,
+                page_digest(layouts, src_path),
+                layouts.assets.digest_of,
+                sources.entries[src_path].stat(),
+                outputs,
+            )
+            or (
+                search is not None
+                and file_url(dst_path, dst_dir_path) not in search.pages
+            )
+        ]
+
+    for page in generate_pages(pages, layouts, jobs, cache, search is not None):
+        if manifest is not None:
+            record_page(manifest, layouts, page, sources.entries[page.src_path].stat())
+        if search is not None:
+            search.update(
+                file_url(page.dst_path, dst_dir_path), page.title, page.sections
+            )
+
+    return layouts
+
+
+class Sources(NamedTuple):
+    """
+    The (markdown path, html path) pair of each page found by `collect_sources`,
+    the directory entry of each markdown file by its path, whose stat result is reused
+    by the manifest, and the relative path of each directory with a `LAYOUT_NAME` file
+    """
+
+    pages: list[tuple[str, str]]
+    entries: dict[str, DirEntry]
+    layout_dirs: list[str]
+
+
+def collect_sources(content_dir_path: str, dst_dir_path: str) -> Sources:
+    """
+    Walks through the directory at `content_dir_path` once, collecting each markdown
+    file and each directory containing a `LAYOUT_NAME` file
     """
     assert path.exists(content_dir_path)
 
-    for item in listdir(content_dir_path):
-        item_path = path.join(content_dir_path, item)
-        dst_path = path.join(dst_dir_path, item)
-        if path.isfile(item_path):
-            if item_path.endswith(".md"):
-                dst_path = dst_path.replace(".md", ".html")
-                generate_page(item_path, dst_path, template_path)
+    sources = Sources([], {}, [])
+
+    for rel_dir, files in scan_tree(content_dir_path):
+        out_dir = path.join(dst_dir_path, rel_dir)
+        for entry in files:
+            if entry.name.endswith(".md"):
+                html_name = entry.name.removesuffix(".md") + ".html"
+                sources.pages.append((entry.path, path.join(out_dir, html_name)))
+                sources.entries[entry.path] = entry
+            elif entry.name == LAYOUT_NAME:
+                sources.layout_dirs.append(rel_dir)
+
+    return sources
+
+
+def collect_outputs(dst_dir_path: str) -> set[str]:
+    """
+    Returns the paths of the html files in the directory at `dst_dir_path`, which are
+    listed a directory at a time rather than checked one by one
+    """
+    if not path.isdir(dst_dir_path):
+        return set()
+    return {
+        entry.path
+        for _, files in scan_tree(dst_dir_path)
+        for entry in files
+        if entry.name.endswith(".html")
+    }
+
+
+def page_digest(layouts: Layouts, src_path: str) -> str:
+    """
+    Returns the digest recorded in the manifest for the page at `src_path`,
+    which changes with its layout and with `PARSER_VERSION`
+    """
+    digest = layouts.for_page(src_path).digest
+    return hash_bytes(f"{PARSER_VERSION}\0{digest}".encode("utf-8"))
+
+
+def record_page(
+    manifest: BuildManifest,
+    layouts: Layouts,
+    page: GeneratedPage,
+    src_stat: stat_result | None = None,
+):
+    """
+    Records `page` in `manifest` along with the digests of its layout and of the
+    assets it links to, which `BuildManifest.is_current` checks on later builds.
+    `src_stat` is the result of statting the page's source, if it is already known.
+    """
+    manifest.record(
+        page.src_path,
+        page.dst_path,
+        page_digest(layouts, page.src_path),
+        page.links,
+        page.anchors,
+        page.asset_urls,
+        layouts.assets.digest_of(page.asset_urls),
+        src_stat,
+    )
+
+
+def page_path(src_path: str, content_dir_path: str, dst_dir_path: str) -> str:
+    """Returns the path of the html file generated from the markdown file at `src_path`"""
+    dst_path = path.join(dst_dir_path, path.relpath(src_path, content_dir_path))
+    return dst_path.removesuffix(".md") + ".html"
+
+
+def is_within(file_path: str, dir_path: str) -> bool:
+    """Returns `True` if `file_path` is inside the directory at `dir_path`"""
+    dir_path = path.abspath(dir_path)
+    return path.commonpath([path.abspath(file_path), dir_path]) == dir_path
+
+
+def generate_pages(
+    pages: list[tuple[str, str]],
+    layouts: Layouts,
+    jobs: int = 1,
+    cache: ParseCache | None = None,
+    sections: bool = False,
+) -> Iterator[GeneratedPage]:
+    """
+    Generates each (markdown path, html path) pair in `pages` with its template
+    from `layouts`, yielding each page once it has been written, along with the
+    plain text of its sections if `sections` is `True`.
+    Each output directory is created once, before any page is generated.
+    Raises a `PageGenerationError` naming the source of the first page that fails.
+    """
+    if jobs == 0:
+        jobs = cpu_count() or 1
+
+    for dst_dir in {path.dirname(dst_path) for _, dst_path in pages}:
+        makedirs(dst_dir, exist_ok=True)
+
+    if jobs == 1 or len(pages) <= 1:
+        for page in pages:
+            yield _generate_page_job(page, layouts, cache, sections)[0]
+        return
+
+    chunksize = max(1, len(pages) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(layouts, cache, sections, PROFILER.enabled),
+    ) as executor:
+        results = executor.map(_generate_page_job, pages, chunksize=chunksize)
+        for generated, profile in results:
+            if profile:
+                PROFILER.merge(profile)
+            yield generated
+
+
+_worker_layouts: Layouts | None = None
+_worker_cache: ParseCache | None = None
+_worker_sections = False
+
+
+def _init_worker(
+    layouts: Layouts, cache: ParseCache | None, sections: bool, profile: bool
+):
+    # pylint: disable-next=global-statement
+    global _worker_layouts, _worker_cache, _worker_sections
+    _worker_layouts = layouts
+    _worker_cache = cache
+    _worker_sections = sections
+    PROFILER.enabled = profile
+
+
+def _generate_page_job(
+    page: tuple[str, str],
+    layouts: Layouts | None = None,
+    cache: ParseCache | None = None,
+    sections: bool = False,
+) -> tuple[GeneratedPage, dict | None]:
+    src_path, dst_path = page
+    worker = layouts is None
+    if worker:
+        layouts, cache, sections = _worker_layouts, _worker_cache, _worker_sections
+
+    try:
+        template = layouts.for_page(src_path)
+        generated = generate_page(src_path, dst_path, template, cache, sections)
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        raise PageGenerationError(src_path, f"{type(err).__name__}: {err}") from err
+
+    # worker processes send their profiling data back with each page
+    if worker and PROFILER.enabled:
+        return generated, PROFILER.take()
+    return generated, None
+
+
+def generate_page(
+    src_path: str,
+    dst_path: str,
+    template: Template,
+    cache: ParseCache | None = None,
+    sections: bool = False,
+) -> GeneratedPage:
+    """
+    Creates an html file at `dst_path` from a compiled html `template`
+    and a markdown file at `src_path`, reusing its parsed html from `cache` if possible.
+    The plain text of the page's sections is only collected if `sections` is `True`.
+    Each key in the page's front matter fills the placeholder of the same name, and its
+    `title`, if any, is used instead of the first h1 heading. Both are escaped for html,
+    unlike the rendered `Content`.
+    The directory of `dst_path` must already exist. An existing file at `dst_path`
+    is left untouched if its content would not change.
+    """
+    print(f"Generating page from {src_path} to {dst_path} using {template.path}...")
+
+    with PROFILER.page(src_path):
+        with PROFILER.stage("read"):
+            with open(src_path, "r") as md_file:
+                markdown = md_file.read()
+        PROFILER.count("pages")
+        PROFILER.count("bytes read", len(markdown))
+        metadata, markdown = split_front_matter(markdown)
+
+        assets = template.assets.for_page(dst_path)
+        if cache:
+            document = cache.parse(markdown, assets, sections)
         else:
-            generate_pages_recursive(item_path, dst_path, template_path)
+            document = parse_document(markdown, assets, sections)
+
+        title = format_value(metadata["title"]) if "title" in metadata else None
+        title = title or document.title
+        if title is None:
+            raise ValueError("Page must have a title (h1 heading or front matter)")
 
+        values = {key: escape(format_value(value)) for key, value in metadata.items()}
+        values["Title"] = escape(title)
+        values["Content"] = document.iter_html()
+        if PROFILER.enabled:
+            # serialize and substitute up front so that each stage is timed separately
+            with PROFILER.stage("to_html"):
+                values["Content"] = "".join(values["Content"])
+            with PROFILER.stage("template"):
+                content = template.render(values)
+            PROFILER.count("bytes written", len(content))
+            chunks = [content]
+        else:
+            chunks = template.stream(values)
 
-def generate_page(src_path: str, dst_path: str, template_path: str):
+        with PROFILER.stage("write"):
+            changed = write_if_changed(dst_path, chunks)
+        if not changed:
+            PROFILER.count("pages unchanged")
+
+    return GeneratedPage(
+        src_path,
+        dst_path,
+        changed,
+        title,
+        document.sections if sections else None,
+        document.links,
+        document.anchors,
+        assets.referenced(markdown),
+    )
+
+
+def format_value(value: str | int | float | bool | list) -> str:
+    """Returns a front matter value as the text that fills a template placeholder"""
+    if isinstance(value, list):
+        return ", ".join(format_value(item) for item in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def write_page_list(
+    manifest: BuildManifest,
+    metadata: MetadataCache | None = None,
+    sources: set[str] | None = None,
+) -> list[dict]:
     """
-    Creates an html file at `dst_path` from an html template at
-    `template_path` and a markdown file at `src_path`
+    Writes the url and metadata of every page in `manifest` to `LISTING_PATH`,
+    for listing pages, navigation and sitemaps. Metadata is read from the header
+    of each page whose source changed since the last listing, and cached otherwise,
+    in `metadata` if given or else in the cache loaded from `METADATA_PATH`.
+    If `sources` are given, only those sources are checked for changes.
+    Pages whose source no longer exists are left out.
+    Returns the listing.
     """
-    print(f"Generating page from {src_path} to {dst_path} using {template_path}...")
+    if metadata is None:
+        metadata = MetadataCache.load(METADATA_PATH)
+    misses = metadata.misses
+    listing = []
+    listed = set()
+    for src_path, entry in manifest.pages.items():
+        try:
+            page_metadata = metadata.get(
+                src_path, sources is None or src_path in sources
+            )
+        except FileNotFoundError:
+            # the source was deleted since the page was recorded
+            continue
+        listing.append(
+            {**page_metadata, "url": file_url(entry["output_path"], PUBLIC_DIR)}
+        )
+        listed.add(src_path)
+    listing.sort(key=lambda page: page["url"])
+    removed = metadata.retain(listed)
+    PROFILER.count("metadata reads", metadata.misses - misses)
 
-    with open(src_path, "r") as md_file:
-        markdown = md_file.read()
-    with open(template_path, "r") as template_file:
-        template_html = template_file.read()
+    write_if_changed(
+        LISTING_PATH, [json.dumps(listing, ensure_ascii=False, indent=2), "\n"]
+    )
+    if metadata.misses != misses or removed:
+        metadata.save()
+    return listing
 
-    html = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
 
-    result = template_html.replace("{{ Title }}", title).replace("{{ Content }}", html)
+def report_broken_links(manifest: BuildManifest, jobs: int = 1) -> list:
+    """
+    Prints every broken link in the pages recorded in `manifest`, checked against the
+    outputs in `PUBLIC_DIR` by `jobs` processes, and returns them
+    """
+    broken = check_links(manifest, PUBLIC_DIR, jobs)
+    for link in broken:
+        print(link)
+    PROFILER.count("broken links", len(broken))
+    return broken
 
-    if not path.exists(path.dirname(dst_path)):
-        makedirs(path.dirname(dst_path))
 
-    with open(dst_path, "w") as dst_file:
-        dst_file.write(result)
+def write_search_index(search: SearchIndex, manifest: BuildManifest):
+    """
+    Removes pages that no longer exist from the `search` index,
+    then writes its changed shards to `SEARCH_DIR` and saves it
+    """
+    search.retain(
+        {
+            file_url(entry["output_path"], PUBLIC_DIR)
+            for entry in manifest.pages.values()
+        }
+    )
+    written = search.write(SEARCH_DIR)
+    PROFILER.count("search shards written", len(written))
+    search.save()
+
 
+def remove_search_index():
+    """Deletes the search index and its state, which would go stale without updates"""
+    if path.exists(SEARCH_STATE_PATH):
+        remove(SEARCH_STATE_PATH)
+    remove_index(SEARCH_DIR)
 
-def copy_static():
+
+def copy_static(manifest: BuildManifest | None = None) -> AssetMap:
     """
     Deletes the contents of the `public` directory,
-    then copies the contents of `static` into `public`
+    then copies the contents of `static` into `public`.
+    If a `manifest` is given, `public` is instead synced with `static`:
+    only new or changed files are copied, and only files whose source
+    has been deleted are removed. Each synced file also gets a fingerprinted copy.
+    Returns the map from each asset's url to its fingerprinted copy's url.
     """
-    static = path.join(curdir, "static")
-    public = path.join(curdir, "public")
+    static = path.join(curdir, STATIC_DIR)
+    public = path.join(curdir, PUBLIC_DIR)
+
+    if manifest is None:
+        if path.exists(public):
+            rmtree(public)
+        copy_dir(static, public)
+        return AssetMap()
 
-    rmtree(public)
-    copy_dir(static, public)
+    previous_assets = manifest.assets
+    result = sync_dir(static, public, manifest)
+    print(
+        f"Synced static files: {len(result.copied)} copied, "
+        f"{len(result.removed)} removed"
+    )
+    return fingerprint_assets(manifest, previous_assets, public)
 
 
 def copy_dir(src: str, dst: str):
@@ -81,17 +800,12 @@ def copy_dir(src: str, dst: str):
     Files in `dst` that have the same name as a file in `src` are overwritten.
     """
     assert path.exists(src)
-    if not path.exists(dst):
-        mkdir(dst)
 
-    for item in listdir(src):
-        item_path = path.join(src, item)
-        if path.isfile(item_path):
-            copy(item_path, dst)
-        else:
-            dst_item_path = path.join(dst, item)
-            mkdir(dst_item_path)
-            copy_dir(item_path, dst_item_path)
+    for rel_dir, files in scan_tree(src):
+        out_dir = path.join(dst, rel_dir)
+        makedirs(out_dir, exist_ok=True)
+        for entry in files:
+            copy(entry.path, out_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+"""
+Provides a persistent record of the inputs used to generate each page,
+allowing builds to skip pages whose inputs have not changed
+"""
+
+from hashlib import blake2b
+from os import path, remove, stat, stat_result
+from typing import Callable
+
+from output import load_state, save_state
+
+
+def hash_bytes(data: bytes) -> str:
+    """Returns a short hex digest of `data` used to detect changed inputs"""
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """Returns the digest of the contents of the file at `file_path`"""
+    with open(file_path, "rb") as file:
+        return hash_bytes(file.read())
+
+
+class BuildManifest:
+    """
+    Records the source hash, template hash and output path of every generated page,
+    along with the urls it links to, its heading anchors and the digest of the assets
+    it uses, the static assets copied into the output directory, and the outputs that
+    have compressed sidecars.
+    Source files are only re-hashed when their size or modification time changes.
+    """
+
+    VERSION = 4
+
+    def __init__(
+        self,
+        manifest_path: str | None = None,
+        pages: dict | None = None,
+        assets: dict | None = None,
+        compressed: list | None = None,
+    ):
+        self.manifest_path = manifest_path
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        self.compressed = compressed if compressed is not None else []
+        self.seen = set()
+        self._hashes = {}
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "BuildManifest":
+        """
+        Loads the manifest saved at `manifest_path`.
+        Returns an empty manifest if `load_state` finds no usable state there.
+        """
+        data = load_state(manifest_path, cls.VERSION)
+        if data is None:
+            return cls(manifest_path)
+
+        return cls(
+            manifest_path, data["pages"], data.get("assets"), data.get("compressed")
+        )
+
+    def is_current(
+        self,
+        src_path: str,
+        dst_path: str,
+        template_hash: str,
+        asset_digest: Callable[[list[str]], str] | None = None,
+        src_stat: stat_result | None = None,
+        outputs: set[str] | None = None,
+    ) -> bool:
+        """
+        Returns `True` if the page at `dst_path` was generated from the current contents
+        of `src_path` using a template with digest `template_hash`, and, if given
+        `asset_digest`, if it returns the recorded digest for the asset urls of the page.
+        `src_stat` is the result of statting `src_path`, if it is already known, and
+        `outputs` the set of existing output paths, which is looked up instead of
+        checking whether `dst_path` exists.
+        """
+        self.seen.add(src_path)
+
+        entry = self.pages.get(src_path)
+        if (
+            not entry
+            or entry["output_path"] != dst_path
+            or entry["template_hash"] != template_hash
+            or (
+                asset_digest is not None
+                and entry["asset_digest"] != asset_digest(entry["asset_urls"])
+            )
+            or not (
+                dst_path in outputs if outputs is not None else path.exists(dst_path)
+            )
+        ):
+            return False
+
+        if src_stat is None:
+            src_stat = stat(src_path)
+        if entry["size"] == src_stat.st_size and entry["mtime"] == src_stat.st_mtime_ns:
+            return True
+
+        source_hash = hash_file(src_path)
+        self._hashes[src_path] = source_hash
+        if entry["source_hash"] != source_hash:
+            return False
+
+        entry["size"] = src_stat.st_size
+        entry["mtime"] = src_stat.st_mtime_ns
+        return True
+
+    def record(
+        self,
+        src_path: str,
+        dst_path: str,
+        template_hash: str,
+        links: list[str] | None = None,
+        anchors: list[str] | None = None,
+        asset_urls: list[str] | None = None,
+        asset_digest: str = "",
+        src_stat: stat_result | None = None,
+    ):
+        """
+        Records that the page at `dst_path` has been generated from `src_path`,
+        linking to the urls in `links` and containing the heading `anchors`.
+        `asset_urls` are the urls of the local files the page's markdown links to,
+        and `asset_digest` the digest of the assets among them it was rendered with.
+        `src_stat` is the result of statting `src_path`, if it is already known.
+        """
+        self.seen.add(src_path)
+
+        if src_stat is None:
+            src_stat = stat(src_path)
+        source_hash = self._hashes.pop(src_path, None) or hash_file(src_path)
+
+        self.pages[src_path] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "output_path": dst_path,
+            "size": src_stat.st_size,
+            "mtime": src_stat.st_mtime_ns,
+            "links": links or [],
+            "anchors": anchors or [],
+            "asset_urls": asset_urls or [],
+            "asset_digest": asset_digest,
+        }
+
+    def remove_page(self, src_path: str) -> str | None:
+        """
+        Deletes the output generated from `src_path` and removes it from the manifest.
+        Returns the path of the deleted output, if there was one.
+        """
+        entry = self.pages.pop(src_path, None)
+        if not entry or not path.exists(entry["output_path"]):
+            return None
+
+        remove(entry["output_path"])
+        return entry["output_path"]
+
+    def remove_stale(self) -> list[str]:
+        """
+        Deletes the outputs of pages whose sources were not seen during this build,
+        and removes them from the manifest. Returns the paths of the deleted outputs.
+        """
+        removed = []
+
+        for src_path in [src for src in self.pages if src not in self.seen]:
+            dst_path = self.remove_page(src_path)
+            if dst_path:
+                removed.append(dst_path)
+
+        return removed
+
+    def save(self):
+        """Writes the manifest to `self.manifest_path`"""
+        if not self.manifest_path:
+            return
+
+        save_state(
+            self.manifest_path,
+            self.VERSION,
+            {"pages": self.pages, "assets": self.assets, "compressed": self.compressed},
+        )
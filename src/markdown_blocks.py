@@ -3,10 +3,14 @@ Provides functionality for converting markdown documents to blocks for further p
 """
 
 import re
+from collections import OrderedDict
 from enum import Enum
+from typing import Iterable, Iterator, NamedTuple
 
-from htmlnode import LeafNode, ParentNode
+from assets import AssetMap
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode
 from inline_markdown import text_to_textnodes
+from profiling import PROFILER
 
 BlockType = Enum(
     "BlockType",
@@ -16,13 +20,21 @@ BlockType = Enum(
 
 def extract_title(markdown: str) -> str:
     """Gets the title of a markdown page"""
-    blocks = markdown_to_blocks(markdown)
+    title = find_title(iter_blocks(markdown))
+    if title is None:
+        raise ValueError("Page must have a title (h1 heading)")
+    return title
 
-    for block in blocks:
-        if block.startswith("# "):
-            return block[2:]
 
-    raise ValueError("Page must have a title (h1 heading)")
+def find_title(blocks: Iterable["Block"]) -> str | None:
+    """
+    Returns the text of the first h1 heading among `blocks`, or `None` if there is none.
+    Stops consuming `blocks` at that heading.
+    """
+    for block in blocks:
+        if block.block_type == BlockType.Heading and block.lines[0].startswith("# "):
+            return block.text[2:]
+    return None
 
 
 def markdown_to_html_node(markdown: str) -> ParentNode:
@@ -30,88 +42,255 @@ def markdown_to_html_node(markdown: str) -> ParentNode:
     Converts a `str` representing a markdown document
     into an `HTMLNode` for converting to html
     """
+    return ParentNode("div", [render_block(block) for block in iter_blocks(markdown)])
+
+
+def block_to_html_node(block: "Block", assets: AssetMap | None = None) -> ParentNode:
+    """
+    Converts a single markdown `Block` into an `HTMLNode`,
+    resolving the urls of links and images with `assets` if given
+    """
 
     def text_to_leaf_nodes(text: str) -> list[LeafNode]:
-        return [node.to_html_node() for node in text_to_textnodes(text)]
+        return [node.to_html_node(assets) for node in text_to_textnodes(text)]
 
-    blocks = markdown_to_blocks(markdown)
-    nodes = []
+    match block.block_type:
+        case BlockType.Paragraph:
+            return ParentNode("p", text_to_leaf_nodes(block.text))
 
-    for block in blocks:
-        match get_block_type(block):
-            case BlockType.Paragraph:
-                node = ParentNode("p", text_to_leaf_nodes(block))
-
-            case BlockType.Heading:
-                hashes, content = block.split(" ", 1)
-                node = ParentNode(f"h{len(hashes)}", text_to_leaf_nodes(content))
-
-            case BlockType.Code:
-                content = block[3:-3].strip()
-                node = ParentNode(
-                    "pre", [ParentNode("code", text_to_leaf_nodes(content))]
-                )
-
-            case BlockType.Quote:
-                lines = block.split("\n")
-                content = "\n".join(map(lambda line: line.removeprefix("> "), lines))
-                node = ParentNode("blockquote", text_to_leaf_nodes(content))
-
-            case BlockType.UnorderedList:
-                lines = block.split("\n")
-                list_items = []
-                for line in lines:
-                    line_content = line[2:]
-                    line_nodes = text_to_leaf_nodes(line_content)
-                    list_items.append(ParentNode("li", line_nodes))
-                node = ParentNode("ul", list_items)
-
-            case BlockType.OrderedList:
-                lines = block.split("\n")
-                list_items = []
-                for i, line in enumerate(lines):
-                    line_content = line.removeprefix(f"{i + 1}. ")
-                    line_nodes = text_to_leaf_nodes(line_content)
-                    list_items.append(ParentNode("li", line_nodes))
-                node = ParentNode("ol", list_items)
-
-            case _:
-                raise ValueError("Invalid block")
-
-        nodes.append(node)
-
-    return ParentNode("div", nodes)
+        case BlockType.Heading:
+            hashes, content = block.text.split(" ", 1)
+            return ParentNode(f"h{len(hashes)}", text_to_leaf_nodes(content))
+
+        case BlockType.Code:
+            content = block.text[3:-3].strip()
+            return ParentNode("pre", [ParentNode("code", text_to_leaf_nodes(content))])
+
+        case BlockType.Quote:
+            content = "\n".join(line.removeprefix("> ") for line in block.lines)
+            return ParentNode("blockquote", text_to_leaf_nodes(content))
+
+        case BlockType.UnorderedList:
+            list_items = [
+                ParentNode("li", text_to_leaf_nodes(line[2:])) for line in block.lines
+            ]
+            return ParentNode("ul", list_items)
+
+        case BlockType.OrderedList:
+            list_items = [
+                ParentNode("li", text_to_leaf_nodes(line.split(" ", 1)[1]))
+                for line in block.lines
+            ]
+            return ParentNode("ol", list_items)
+
+        case _:
+            raise ValueError("Invalid block")
+
+
+# The default number of rendered blocks kept by `BLOCK_MEMO`
+DEFAULT_MEMO_ENTRIES = 4096
+# Blocks longer than this are rarely repeated, so they are rendered without the memo
+MAX_MEMO_BLOCK_LENGTH = 16384
+
+
+class BlockMemo:
+    """
+    Keeps the rendered html of up to `max_entries` blocks, keyed by their type and text,
+    so that blocks repeated across pages are only rendered once.
+    When it is full, the least recently used block is forgotten.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, block: "Block", assets: AssetMap | None = None) -> HTMLNode:
+        """
+        Returns the html node for `block` rendered with `assets`,
+        rendering it only if it is not memoized
+        """
+        text = block.text
+        if self.max_entries <= 0 or len(text) > MAX_MEMO_BLOCK_LENGTH:
+            return block_to_html_node(block, assets)
+
+        key = (assets.key(text) if assets else "", block.block_type, text)
+        node = self._entries.get(key)
+        if node is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            PROFILER.count("block memo hits")
+            return node
+
+        self.misses += 1
+        PROFILER.count("block memo misses")
+
+        source = block_to_html_node(block, assets)
+        node = RawNode(source.to_html(), source.text_content(), tuple(source.links()))
+        self._entries[key] = node
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return node
+
+    def clear(self):
+        """Forgets every memoized block"""
+        self._entries.clear()
+
+
+# The memo shared by every page rendered in this process
+BLOCK_MEMO = BlockMemo()
+
+
+def render_block(block: "Block", assets: AssetMap | None = None) -> HTMLNode:
+    """Converts a single markdown `Block` into an `HTMLNode` using `BLOCK_MEMO`"""
+    return BLOCK_MEMO.render(block, assets)
+
+
+class Block(NamedTuple):
+    """A markdown block split into lines, with its `BlockType` already determined"""
+
+    block_type: BlockType
+    lines: list[str]
+
+    @property
+    def text(self) -> str:
+        """The block's lines joined back into a single string"""
+        return "\n".join(self.lines)
+
+
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+UNORDERED_ITEM_PATTERN = re.compile(r"[*-] ")
+ORDERED_ITEM_PATTERN = re.compile(r"(\d+)\. ")
+
+
+class _BlockScanner:
+    """
+    Accumulates the lines of a single block, classifying each line as it is added.
+    Each line is classified once the next line arrives, so that trailing whitespace
+    can be stripped from the last line of the block before it is classified.
+    """
+
+    def __init__(self, first_line: str):
+        self.lines = [first_line]
+        self.quote = True
+        self.unordered = True
+        self.ordered = True
+
+    def add(self, line: str):
+        """Adds the next line of the block"""
+        self._classify(self.lines[-1], len(self.lines))
+        self.lines.append(line)
+
+    def finish(self) -> Block:
+        """Returns the completed block"""
+        last = self.lines[-1] = self.lines[-1].rstrip()
+        self._classify(last, len(self.lines))
+        first = self.lines[0]
+
+        if HEADING_PATTERN.match(first):
+            block_type = BlockType.Heading
+        elif first.startswith("```") and last.endswith("```"):
+            block_type = BlockType.Code
+        elif self.quote:
+            block_type = BlockType.Quote
+        elif self.unordered:
+            block_type = BlockType.UnorderedList
+        elif self.ordered:
+            block_type = BlockType.OrderedList
+        else:
+            block_type = BlockType.Paragraph
+
+        return Block(block_type, self.lines)
+
+    def _classify(self, line: str, number: int):
+        if self.quote and not line.startswith("> "):
+            self.quote = False
+        if self.unordered and not UNORDERED_ITEM_PATTERN.match(line):
+            self.unordered = False
+        if self.ordered:
+            match = ORDERED_ITEM_PATTERN.match(line)
+            self.ordered = match is not None and match.group(1) == str(number)
+
+
+def iter_blocks(markdown: str) -> Iterator[Block]:
+    """
+    Splits the given text into markdown blocks in a single pass over its lines,
+    yielding each block with its type. Blocks are delimited by blank lines,
+    except inside fenced code blocks, which may contain blank lines.
+    """
+    return iter_blocks_from_lines(markdown.split("\n"))
+
+
+def iter_blocks_from_lines(lines: Iterable[str]) -> Iterator[Block]:
+    """
+    Splits lines without their line endings into markdown blocks like `iter_blocks`,
+    consuming no more lines than it takes to complete each block
+    """
+    return _scan_blocks(lines, fences=True)
+
+
+def _scan_blocks(lines: Iterable[str], fences: bool) -> Iterator[Block]:
+    scanner = None
+    in_fence = False
+
+    for line in lines:
+        if in_fence:
+            scanner.add(line)
+            if line.rstrip().endswith("```"):
+                yield scanner.finish()
+                scanner = None
+                in_fence = False
+            continue
+
+        if not line or line.isspace():
+            if scanner:
+                yield scanner.finish()
+                scanner = None
+            continue
+
+        if scanner:
+            scanner.add(line)
+            continue
+
+        line = line.lstrip()
+        scanner = _BlockScanner(line)
+        if fences and line.startswith("```"):
+            fence = line.rstrip()
+            if len(fence) >= 6 and fence.endswith("```"):
+                yield scanner.finish()
+                scanner = None
+            else:
+                in_fence = True
+
+    if not scanner:
+        return
+
+    if in_fence:
+        # the fence was never closed, so treat its lines as ordinary blocks
+        yield from _scan_blocks(scanner.lines, fences=False)
+    else:
+        yield scanner.finish()
 
 
 def markdown_to_blocks(markdown: str) -> list[str]:
     """
     Splits the given text into markdown blocks.
-    Blocks are delimited by two new lines.
+    Blocks are delimited by blank lines.
     """
-    blocks = markdown.split("\n\n")
-    blocks = map(lambda block: block.strip(), blocks)
-    blocks = filter(lambda block: block != "", blocks)
-
-    return list(blocks)
+    return [block.text for block in iter_blocks(markdown)]
 
 
 def get_block_type(block: str) -> BlockType:
     """
     Determines the block type of a markdown block
     """
-    if re.match(r"^#{1,6} .*", block):
-        return BlockType.Heading
-
     lines = block.split("\n")
-    if lines and re.match(r"^```", lines[0]) and re.search(r"```$", lines[-1]):
-        return BlockType.Code
-    if all(re.match(r"^> ", line) for line in lines):
-        return BlockType.Quote
-    if all(re.match(r"^[*-] ", line) for line in lines):
-        return BlockType.UnorderedList
-    if all(
-        re.match(r"^" + str(i + 1) + r"\. .*", line) for (i, line) in enumerate(lines)
-    ):
-        return BlockType.OrderedList
-
-    return BlockType.Paragraph
+    scanner = _BlockScanner(lines[0])
+    for line in lines[1:]:
+        scanner.add(line)
+
+    return scanner.finish().block_type
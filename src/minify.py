@@ -0,0 +1,168 @@
+"""
+Provides html minification, which `Template` applies to its text once when it is
+compiled, and which also works on a stream of chunks without joining them first.
+Runs of whitespace are collapsed to a single space, and removed entirely next to
+block-level tags, where they cannot affect the rendered page. The content of `<pre>`,
+`<code>`, `<textarea>`, `<script>` and `<style>` elements is left untouched.
+"""
+
+import re
+from typing import Iterable, Iterator
+
+# Chunks are collected until there are this many characters, then minified together
+BATCH_SIZE = 1 << 14
+
+# Only ascii whitespace is collapsed, so non-breaking spaces are kept
+WHITESPACE = " \t\n\r\f"
+# Matches the runs of whitespace that are not already a single space
+WHITESPACE_PATTERN = re.compile(r"[\t\n\r\f][ \t\n\r\f]*| [ \t\n\r\f]+")
+
+# Elements whose content is output exactly as it is
+RAW_TAGS = ("pre", "code", "textarea", "script", "style")
+RAW_OPEN_PATTERN = re.compile(rf"<({'|'.join(RAW_TAGS)})\b[^>]*>", re.IGNORECASE)
+RAW_CLOSE_PATTERNS = {
+    name: re.compile(rf"</{name}\s*>", re.IGNORECASE) for name in RAW_TAGS
+}
+
+# Elements around which whitespace is never rendered
+BLOCK_TAGS = (
+    "html", "head", "body", "title", "meta", "link", "base", "script", "style",
+    "noscript", "div", "p", "article", "section", "main", "header", "footer", "nav",
+    "aside", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+    "pre", "blockquote", "figure", "figcaption", "hr", "br", "table", "thead",
+    "tbody", "tfoot", "tr", "th", "td", "caption", "form", "fieldset", "legend",
+    "details", "summary", "address",
+)  # fmt: skip
+BLOCK_NAMES = frozenset(BLOCK_TAGS + ("!doctype",))
+BLOCK_TAG_PATTERN = re.compile(r"</?([\w!]+)[^>]*>")
+# Tags after and before a single space. Tag names are matched case-insensitively
+# by looking them up in `BLOCK_NAMES`, which is much faster than an ignorecase regex.
+SPACE_BEFORE_TAG_PATTERN = re.compile(r" </?([\w!]+)")
+SPACE_AFTER_TAG_PATTERN = re.compile(r"</?([\w!]+)[^>]*> ")
+
+
+class HTMLMinifier:
+    """
+    Minifies html fed to it in chunks of any size. Chunks are collected into batches
+    of about `batch_size` characters, and each batch is minified with a few regular
+    expression substitutions up to its last complete tag. The content of raw elements
+    is passed through as it arrives, so each call to `feed` returns the minified html
+    that can already be written.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._pending = []
+        self._pending_size = 0
+        self._next_drain = batch_size
+        self._after_block = True
+        # the name of the raw element whose content is being passed through
+        self._raw = None
+
+    def feed(self, chunk: str) -> str:
+        """Adds `chunk` to the html, returning the minified html that is complete"""
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        if self._pending_size < self._next_drain:
+            return ""
+        return self._drain(final=False)
+
+    def close(self) -> str:
+        """Returns the rest of the minified html"""
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> str:
+        buffer = "".join(self._pending)
+        parts = []
+        position = 0
+
+        while True:
+            if self._raw is not None:
+                close = RAW_CLOSE_PATTERNS[self._raw].search(buffer, position)
+                if close is None:
+                    # pass the content through, holding back what may be the start
+                    # of the closing tag, so that no data is ever searched twice
+                    end = len(buffer)
+                    tag_start = buffer.rfind("<", position)
+                    if (
+                        not final
+                        and tag_start != -1
+                        and _may_close(buffer[tag_start:], self._raw)
+                    ):
+                        end = tag_start
+                    parts.append(buffer[position:end])
+                    position = end
+                    break
+
+                parts.append(buffer[position : close.start()])
+                position = close.start()
+                self._raw = None
+                self._after_block = False
+
+            end = len(buffer) if final else max(position, buffer.rfind(">") + 1)
+            match = RAW_OPEN_PATTERN.search(buffer, position, end)
+            if match is None:
+                parts.append(self._minify(buffer[position:end]))
+                position = end
+                break
+
+            parts.append(self._minify(buffer[position : match.end()]))
+            position = match.end()
+            self._raw = match.group(1).lower()
+
+        rest = buffer[position:]
+        self._pending = [rest] if rest else []
+        self._pending_size = len(rest)
+        self._next_drain = len(rest) + self.batch_size
+        return "".join(parts)
+
+    def _minify(self, html: str) -> str:
+        """Minifies `html`, which does not contain any raw element's content"""
+        if self._after_block:
+            html = html.lstrip(WHITESPACE)
+        if not html:
+            return ""
+
+        html = WHITESPACE_PATTERN.sub(" ", html)
+        html = SPACE_BEFORE_TAG_PATTERN.sub(_strip_block_space, html)
+        html = SPACE_AFTER_TAG_PATTERN.sub(_strip_block_space, html)
+
+        tag_start = html.rfind("<")
+        match = BLOCK_TAG_PATTERN.match(html, tag_start) if tag_start != -1 else None
+        self._after_block = (
+            match is not None
+            and match.end() == len(html)
+            and match.group(1).lower() in BLOCK_NAMES
+        )
+        return html
+
+
+def _may_close(tail: str, name: str) -> bool:
+    """Returns `True` if `tail` may be the start of the closing tag of `name`"""
+    closing = f"</{name}"
+    if len(tail) <= len(closing):
+        return closing.startswith(tail.lower())
+    return tail[: len(closing)].lower() == closing and tail[len(closing) :].isspace()
+
+
+def _strip_block_space(match: re.Match) -> str:
+    if match[1].lower() in BLOCK_NAMES:
+        return match[0].strip(" ")
+    return match[0]
+
+
+def minify_chunks(chunks: Iterable[str], batch_size: int = BATCH_SIZE) -> Iterator[str]:
+    """Yields the minified html of `chunks` as it becomes complete"""
+    minifier = HTMLMinifier(batch_size)
+    for chunk in chunks:
+        minified = minifier.feed(chunk)
+        if minified:
+            yield minified
+    rest = minifier.close()
+    if rest:
+        yield rest
+
+
+def minify_html(html: str) -> str:
+    """Returns `html` minified"""
+    return "".join(minify_chunks([html]))
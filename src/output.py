@@ -0,0 +1,108 @@
+"""
+Provides writing of generated files that leaves unchanged files untouched,
+so that their modification times only change when their content does,
+and loading and saving of the versioned json state files kept between builds
+"""
+
+import json
+from os import getpid, makedirs, path, remove, replace
+from typing import BinaryIO, Iterable
+
+# The size of the pieces an existing file's unchanged prefix is copied in
+COPY_CHUNK_SIZE = 1 << 16
+
+
+def write_if_changed(dst_path: str, chunks: Iterable[str]) -> bool:
+    """
+    Writes the utf-8 encoded `chunks` to `dst_path` unless the file there already has
+    exactly that content. The chunks are compared against the existing file as they
+    are produced, and a changed file is written to a temporary file that then atomically
+    replaces `dst_path`, so a partially written file is never visible.
+    Returns whether `dst_path` was written.
+    """
+    chunks = iter(chunks)
+
+    try:
+        existing = open(dst_path, "rb")  # pylint: disable=consider-using-with
+    except FileNotFoundError:
+        _write_new(dst_path, None, 0, b"", chunks)
+        return True
+
+    with existing:
+        matched = 0
+        mismatch = b""
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            if existing.read(len(data)) != data:
+                mismatch = data
+                break
+            matched += len(data)
+        else:
+            if not existing.read(1):
+                return False
+
+        _write_new(dst_path, existing, matched, mismatch, chunks)
+        return True
+
+
+def _write_new(
+    dst_path: str,
+    existing: BinaryIO | None,
+    matched: int,
+    first: bytes,
+    chunks: Iterable[str],
+):
+    """
+    Writes the first `matched` bytes of `existing`, then `first`, then the rest of
+    `chunks` to a temporary file, and moves it to `dst_path`
+    """
+    tmp_path = f"{dst_path}.{getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as tmp_file:
+            if existing is not None:
+                existing.seek(0)
+                while matched > 0:
+                    data = existing.read(min(matched, COPY_CHUNK_SIZE))
+                    tmp_file.write(data)
+                    matched -= len(data)
+            tmp_file.write(first)
+            for chunk in chunks:
+                tmp_file.write(chunk.encode("utf-8"))
+        replace(tmp_path, dst_path)
+    except BaseException:
+        try:
+            remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_state(state_path: str, version: int) -> dict | None:
+    """
+    Returns the data saved by `save_state` at `state_path`.
+    Returns `None` if it is missing, unreadable, or from another `version`.
+    """
+    try:
+        with open(state_path, "r", encoding="utf-8") as state_file:
+            data = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def save_state(state_path: str, version: int, data: dict):
+    """
+    Writes `data` and its `version` to `state_path` as compact json,
+    through a temporary file so that a partially written state is never loaded
+    """
+    state_dir = path.dirname(state_path)
+    if state_dir:
+        makedirs(state_dir, exist_ok=True)
+
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as state_file:
+        json.dump({"version": version, **data}, state_file, separators=(",", ":"))
+    replace(tmp_path, state_path)
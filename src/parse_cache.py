@@ -0,0 +1,154 @@
+"""
+Provides a persistent on-disk cache of parsed and rendered markdown documents,
+so that pages whose markdown has not changed are never parsed twice
+"""
+
+import pickle
+import zlib
+from os import getpid, makedirs, path, remove, replace, scandir, utime
+from typing import Iterator, NamedTuple
+
+from assets import AssetMap
+from document import PARSER_VERSION, Document, Heading, Section, parse_document
+from manifest import hash_bytes
+from profiling import PROFILER
+
+# The default limit on the total size of the cache on disk, in bytes
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+class CachedDocument(NamedTuple):
+    """
+    The parts of a `Document` needed to render a page, as stored in a `ParseCache`.
+    `sections` is `None` if the document was parsed without collecting them.
+    """
+
+    title: str | None
+    outline: list[Heading]
+    html: str
+    sections: list[Section] | None
+    links: list[str]
+    anchors: list[str]
+
+    def iter_html(self) -> Iterator[str]:
+        """Yields the document's rendered html"""
+        yield self.html
+
+
+class ParseCache:
+    """
+    Stores rendered documents in `cache_dir`, keyed by a hash of their markdown, the
+    parser version and the assets they link to. When the cache grows
+    beyond `max_bytes`, `evict` removes the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(markdown: str, assets: AssetMap | None = None) -> str:
+        """Returns the cache key of `markdown` rendered with `assets`"""
+        asset_key = assets.key(markdown) if assets else ""
+        return hash_bytes(f"{PARSER_VERSION}\0{asset_key}\0{markdown}".encode("utf-8"))
+
+    def _entry_path(self, key: str) -> str:
+        return path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> CachedDocument | None:
+        """Returns the document stored under `key`, or `None` if there is none"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                data = entry_file.read()
+            document = CachedDocument(*pickle.loads(zlib.decompress(data)))
+        except (OSError, ValueError, TypeError, zlib.error, pickle.UnpicklingError):
+            return None
+
+        # entries are evicted oldest first, so mark this one as recently used
+        utime(entry_path)
+        return document
+
+    def put(self, key: str, document: CachedDocument):
+        """Stores `document` under `key`"""
+        entry_path = self._entry_path(key)
+        makedirs(path.dirname(entry_path), exist_ok=True)
+
+        data = zlib.compress(
+            pickle.dumps(tuple(document), protocol=pickle.HIGHEST_PROTOCOL), 1
+        )
+        tmp_path = f"{entry_path}.{getpid()}.tmp"
+        with open(tmp_path, "wb") as entry_file:
+            entry_file.write(data)
+        replace(tmp_path, entry_path)
+
+    def parse(
+        self, markdown: str, assets: AssetMap | None = None, sections: bool = False
+    ) -> Document | CachedDocument:
+        """
+        Returns the cached rendering of `markdown` with `assets`, parsing and caching
+        it if needed. If `sections` is `True`, documents cached without their sections
+        are parsed again to collect them.
+        """
+        key = self.key(markdown, assets)
+
+        with PROFILER.stage("cache"):
+            cached = self.get(key)
+        if cached is not None and (cached.sections is not None or not sections):
+            self.hits += 1
+            PROFILER.count("parse cache hits")
+            return cached
+
+        self.misses += 1
+        PROFILER.count("parse cache misses")
+
+        document = parse_document(markdown, assets, sections)
+        with PROFILER.stage("to_html"):
+            html = "".join(document.iter_html())
+        cached = CachedDocument(
+            document.title,
+            document.outline,
+            html,
+            document.sections,
+            document.links,
+            document.anchors,
+        )
+
+        with PROFILER.stage("cache"):
+            self.put(key, cached)
+        return cached
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until the cache is at most
+        `max_bytes` in size. Returns the number of entries removed.
+        """
+        if not path.exists(self.cache_dir):
+            return 0
+
+        entries = []
+        total_size = 0
+        with scandir(self.cache_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with scandir(shard.path) as shard_entries:
+                    for entry in shard_entries:
+                        entry_stat = entry.stat()
+                        entries.append(
+                            (entry_stat.st_mtime_ns, entry_stat.st_size, entry.path)
+                        )
+                        total_size += entry_stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_bytes:
+                break
+            remove(entry_path)
+            total_size -= size
+            removed += 1
+
+        return removed
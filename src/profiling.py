@@ -0,0 +1,133 @@
+"""
+Provides optional timers and counters for each stage of page generation.
+When profiling is disabled, each timed stage costs only a method call.
+"""
+
+import json
+from collections import Counter
+from contextlib import nullcontext
+from time import perf_counter
+
+NULL_CONTEXT = nullcontext()
+
+
+class _Timer:
+    """Context manager adding the time spent inside it to `totals[name]`"""
+
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals: dict[str, float], name: str):
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *_):
+        elapsed = perf_counter() - self.start
+        self.totals[self.name] = self.totals.get(self.name, 0.0) + elapsed
+
+
+class Profiler:
+    """Collects the time spent in each build stage, and the time taken by each page"""
+
+    def __init__(self):
+        self.enabled = False
+        self.stage_times = {}
+        self.stage_calls = Counter()
+        self.counters = Counter()
+        self.page_times = {}
+
+    def stage(self, name: str):
+        """Returns a context manager timing the stage `name` if profiling is enabled"""
+        if not self.enabled:
+            return NULL_CONTEXT
+
+        self.stage_calls[name] += 1
+        return _Timer(self.stage_times, name)
+
+    def page(self, src_path: str):
+        """Returns a context manager timing the page generated from `src_path`"""
+        if not self.enabled:
+            return NULL_CONTEXT
+
+        return _Timer(self.page_times, src_path)
+
+    def count(self, name: str, amount: int = 1):
+        """Adds `amount` to the counter `name` if profiling is enabled"""
+        if self.enabled:
+            self.counters[name] += amount
+
+    def take(self) -> dict:
+        """Returns everything collected so far, and resets the profiler"""
+        data = {
+            "stage_times": self.stage_times,
+            "stage_calls": dict(self.stage_calls),
+            "counters": dict(self.counters),
+            "page_times": self.page_times,
+        }
+        self.stage_times = {}
+        self.stage_calls = Counter()
+        self.counters = Counter()
+        self.page_times = {}
+        return data
+
+    def merge(self, data: dict):
+        """Adds data returned by `take`, such as from a worker process"""
+        for name, elapsed in data["stage_times"].items():
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + elapsed
+        self.stage_calls.update(data["stage_calls"])
+        self.counters.update(data["counters"])
+        self.page_times.update(data["page_times"])
+
+    def slowest_pages(self, count: int) -> list[tuple[str, float]]:
+        """Returns the `count` slowest pages and their times, slowest first"""
+        pages = sorted(self.page_times.items(), key=lambda page: page[1], reverse=True)
+        return pages[:count]
+
+    def report(self, top: int = 10) -> str:
+        """Returns a human readable breakdown of where the build spent its time"""
+        total = sum(self.stage_times.values()) or 1.0
+        lines = [f"{'stage':<12}{'calls':>10}{'seconds':>12}{'share':>8}"]
+
+        for name, elapsed in sorted(
+            self.stage_times.items(), key=lambda stage: stage[1], reverse=True
+        ):
+            lines.append(
+                f"{name:<12}{self.stage_calls[name]:>10}"
+                f"{elapsed:>12.4f}{elapsed / total:>8.1%}"
+            )
+
+        if self.counters:
+            lines.append("")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<22}{value:>12}")
+
+        if self.page_times:
+            lines.append("")
+            lines.append(f"slowest {min(top, len(self.page_times))} pages:")
+            for src_path, elapsed in self.slowest_pages(top):
+                lines.append(f"{elapsed:>10.4f}s  {src_path}")
+
+        return "\n".join(lines)
+
+    def write_json(self, json_path: str, top: int = 10):
+        """Writes the collected data, with only the `top` slowest pages, to `json_path`"""
+        report = {
+            "stages": {
+                name: {"seconds": elapsed, "calls": self.stage_calls[name]}
+                for name, elapsed in self.stage_times.items()
+            },
+            "counters": dict(self.counters),
+            "slowest_pages": [
+                {"source": src_path, "seconds": elapsed}
+                for src_path, elapsed in self.slowest_pages(top)
+            ],
+        }
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2)
+
+
+# The profiler used by every build stage in this process
+PROFILER = Profiler()
@@ -0,0 +1,204 @@
+"""
+Provides a full-text search index built from the plain text of each page while it is
+generated. The index is written as json shards split by term prefix, so that clients
+only load the shards for the terms they search for, and only the shards containing
+terms of changed pages are rewritten.
+"""
+
+import json
+import re
+from os import listdir, makedirs, path, remove, rmdir
+
+from document import Section
+from output import load_state, save_state, write_if_changed
+
+# Terms are lowercased words of at least two characters
+TERM_PATTERN = re.compile(r"\w{2,}")
+# The number of leading characters of a term that name its shard
+PREFIX_LENGTH = 2
+# Matches the file names of shards, so that other files in the index directory,
+# such as pages generated there, are never deleted with the index
+SHARD_PATTERN = re.compile(rf"\w{{{PREFIX_LENGTH}}}\.json")
+# The name of the file listing the title and headings of every indexed page
+PAGES_NAME = "pages.json"
+
+
+def page_terms(sections: list[Section]) -> dict[str, list[str]]:
+    """
+    Returns the anchors of the sections each term appears in, by term.
+    The section before a page's first heading has the anchor `""`.
+    """
+    terms = {}
+    for anchor, heading, text in sections:
+        if heading:
+            text = f"{heading}\n{text}"
+        for term in set(TERM_PATTERN.findall(text.lower())):
+            terms.setdefault(term, []).append(anchor or "")
+    return terms
+
+
+class SearchIndex:
+    """
+    An inverted index from each term to the pages and heading anchors it appears under.
+    The terms of every page are kept in the state file at `state_path`, so that the
+    shards of terms that a changed page gained or lost can be updated without
+    reading any other page.
+    """
+
+    VERSION = 1
+
+    def __init__(self, state_path: str | None = None, pages: dict | None = None):
+        self.state_path = state_path
+        self.pages = pages if pages is not None else {}
+        self._replaced = {}
+
+    @classmethod
+    def load(cls, state_path: str) -> "SearchIndex":
+        """
+        Loads the index state saved at `state_path`.
+        Returns an empty index if `load_state` finds no usable state there.
+        """
+        data = load_state(state_path, cls.VERSION)
+        if data is None:
+            return cls(state_path)
+
+        return cls(state_path, data["pages"])
+
+    def update(self, url: str, title: str, sections: list[Section]):
+        """Indexes the page at `url`, replacing anything indexed for it before"""
+        entry = {
+            "title": title,
+            "headings": {
+                section.anchor: section.heading
+                for section in sections
+                if section.anchor
+            },
+            "terms": page_terms(sections),
+        }
+        if self.pages.get(url) != entry:
+            self._replaced.setdefault(url, self.pages.get(url))
+            self.pages[url] = entry
+
+    def remove(self, url: str):
+        """Removes the page at `url` from the index"""
+        if url in self.pages:
+            self._replaced.setdefault(url, self.pages[url])
+            del self.pages[url]
+
+    def retain(self, urls: set[str]):
+        """Removes every page whose url is not in `urls` from the index"""
+        for url in [url for url in self.pages if url not in urls]:
+            self.remove(url)
+
+    def write(self, index_dir: str) -> list[str]:
+        """
+        Writes the list of pages and every shard changed since the last write to
+        `index_dir`, rebuilding every shard if the index has not been written there.
+        Returns the paths of the shards that were rewritten.
+        """
+        makedirs(index_dir, exist_ok=True)
+        pages_path = path.join(index_dir, PAGES_NAME)
+        rebuild = not path.exists(pages_path)
+
+        removals = {}
+        additions = {}
+        if rebuild:
+            for url, entry in self.pages.items():
+                _add_postings(additions, url, entry)
+        else:
+            for url, old_entry in self._replaced.items():
+                if old_entry:
+                    for term in old_entry["terms"]:
+                        removals.setdefault(term[:PREFIX_LENGTH], []).append(
+                            (url, term)
+                        )
+                if url in self.pages:
+                    _add_postings(additions, url, self.pages[url])
+
+        written = []
+        if rebuild:
+            for file_name in listdir(index_dir):
+                prefix = file_name.removesuffix(".json")
+                if prefix not in additions and SHARD_PATTERN.fullmatch(file_name):
+                    remove(path.join(index_dir, file_name))
+
+        for prefix in sorted(removals.keys() | additions.keys()):
+            shard_path = path.join(index_dir, f"{prefix}.json")
+            shard = {} if rebuild else _read_shard(shard_path)
+
+            if shard is None:
+                shard = self._build_shard(prefix)
+            else:
+                for url, term in removals.get(prefix, ()):
+                    postings = shard.get(term)
+                    if postings is not None:
+                        postings.pop(url, None)
+                        if not postings:
+                            del shard[term]
+                for url, term, anchors in additions.get(prefix, ()):
+                    shard.setdefault(term, {})[url] = anchors
+
+            if shard:
+                data = json.dumps(
+                    shard, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+                )
+                if write_if_changed(shard_path, [data]):
+                    written.append(shard_path)
+            elif path.exists(shard_path):
+                remove(shard_path)
+                written.append(shard_path)
+
+        pages = {
+            url: {"title": entry["title"], "headings": entry["headings"]}
+            for url, entry in sorted(self.pages.items())
+        }
+        write_if_changed(
+            pages_path, [json.dumps(pages, ensure_ascii=False, separators=(",", ":"))]
+        )
+
+        self._replaced = {}
+        return written
+
+    def _build_shard(self, prefix: str) -> dict:
+        """Returns the shard of terms starting with `prefix` from every indexed page"""
+        shard = {}
+        for url, entry in self.pages.items():
+            for term, anchors in entry["terms"].items():
+                if term[:PREFIX_LENGTH] == prefix:
+                    shard.setdefault(term, {})[url] = anchors
+        return shard
+
+    def save(self):
+        """Writes the index state to `self.state_path`"""
+        if not self.state_path:
+            return
+
+        save_state(self.state_path, self.VERSION, {"pages": self.pages})
+
+
+def remove_index(index_dir: str):
+    """
+    Deletes the list of pages and every shard in `index_dir`, and the directory itself
+    if nothing else is left in it
+    """
+    if not path.isdir(index_dir):
+        return
+
+    for file_name in listdir(index_dir):
+        if file_name == PAGES_NAME or SHARD_PATTERN.fullmatch(file_name):
+            remove(path.join(index_dir, file_name))
+    if not listdir(index_dir):
+        rmdir(index_dir)
+
+
+def _add_postings(additions: dict, url: str, entry: dict):
+    for term, anchors in entry["terms"].items():
+        additions.setdefault(term[:PREFIX_LENGTH], []).append((url, term, anchors))
+
+
+def _read_shard(shard_path: str) -> dict | None:
+    try:
+        with open(shard_path, "r", encoding="utf-8") as shard_file:
+            return json.load(shard_file)
+    except (OSError, ValueError):
+        return None
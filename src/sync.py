@@ -0,0 +1,113 @@
+"""
+Provides incremental syncing of static assets into the output directory,
+copying only files that are new or have changed since the last build
+"""
+
+from os import link, makedirs, path, remove, replace, rmdir, stat, utime
+from shutil import copy2
+from typing import NamedTuple
+
+from manifest import BuildManifest, hash_file
+from walk import scan_tree
+
+# Files at least this large are hardlinked into the output directory when possible
+LINK_THRESHOLD = 1 << 20
+
+
+class SyncResult(NamedTuple):
+    """The output paths that were copied and removed by `sync_dir`"""
+
+    copied: list[str]
+    removed: list[str]
+
+
+def sync_dir(
+    src_dir: str, dst_dir: str, manifest: BuildManifest, checksum: bool = False
+) -> SyncResult:
+    """
+    Copies each file in `src_dir` into `dst_dir` unless the existing copy has the same
+    size and modification time. If `checksum` is `True`, files whose modification
+    times differ are compared by content before being copied.
+    Files that were synced by a previous build but whose source has since been deleted
+    are removed. Every synced file is recorded in `manifest.assets`.
+    """
+    assert path.exists(src_dir)
+
+    assets = {}
+    copied = []
+
+    for rel_dir, files in scan_tree(src_dir):
+        out_dir = path.normpath(path.join(dst_dir, rel_dir))
+        makedirs(out_dir, exist_ok=True)
+
+        for entry in files:
+            src_path = entry.path
+            dst_path = path.join(out_dir, entry.name)
+            src_stat = entry.stat()
+
+            if _needs_copy(src_path, src_stat, dst_path, checksum):
+                _copy_file(src_path, dst_path, src_stat.st_size)
+                copied.append(dst_path)
+
+            assets[dst_path] = {
+                "source": src_path,
+                "size": src_stat.st_size,
+                "mtime": src_stat.st_mtime_ns,
+            }
+
+    removed = []
+    for dst_path in manifest.assets:
+        if dst_path not in assets and path.exists(dst_path):
+            remove(dst_path)
+            _remove_empty_dirs(path.dirname(dst_path), dst_dir)
+            removed.append(dst_path)
+
+    manifest.assets = assets
+    return SyncResult(copied, removed)
+
+
+def _needs_copy(src_path: str, src_stat, dst_path: str, checksum: bool) -> bool:
+    try:
+        dst_stat = stat(dst_path)
+    except FileNotFoundError:
+        return True
+
+    if dst_stat.st_size != src_stat.st_size:
+        return True
+    if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+        return False
+    if not checksum or hash_file(src_path) != hash_file(dst_path):
+        return True
+
+    utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return False
+
+
+def _copy_file(src_path: str, dst_path: str, size: int):
+    # copies go through a temporary file so that an existing hardlink
+    # in `dst_dir` is replaced rather than written through to its source
+    tmp_path = f"{dst_path}.tmp"
+
+    if size >= LINK_THRESHOLD:
+        try:
+            link(src_path, tmp_path)
+            replace(tmp_path, dst_path)
+            return
+        except OSError:
+            if path.exists(tmp_path):
+                remove(tmp_path)
+
+    copy2(src_path, tmp_path)
+    replace(tmp_path, dst_path)
+
+
+def _remove_empty_dirs(dir_path: str, root: str):
+    root = path.normpath(root)
+    dir_path = path.normpath(dir_path)
+
+    while dir_path != root and dir_path.startswith(root):
+        try:
+            rmdir(dir_path)
+        except OSError:
+            return
+        dir_path = path.dirname(dir_path)
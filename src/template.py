@@ -0,0 +1,315 @@
+"""
+Provides html templates that are compiled once into literal segments
+and placeholder slots, so pages can be rendered with a single join.
+Templates may extend a parent layout, overriding its blocks, and include
+shared partials, which are all resolved when the template is compiled.
+"""
+
+import re
+from os import path
+from typing import Iterable, Iterator, NamedTuple
+
+from assets import AssetMap
+from manifest import hash_bytes
+from minify import minify_html
+
+PLACEHOLDER_PATTERN = re.compile(r"{{\s*(\w+)\s*}}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(src|href)="([^"]*)"')
+# Matches `{% extends "path" %}`, `{% include "path" %}`, `{% block name %}`
+# and `{% endblock %}` tags
+TAG_PATTERN = re.compile(r'{%\s*(\w+)(?:\s+(?:"([^"]*)"|(\w+)))?\s*%}')
+# The name of the file that sets the layout of a content directory and its children
+LAYOUT_NAME = "template.html"
+
+
+class Template:
+    """
+    An html template containing `{{ Name }}` placeholders.
+    Placeholders without a value when rendering are left in the output unchanged.
+    `dependencies` are the paths of the files the template was compiled from.
+    Pages rendered with the template resolve their asset urls using `assets`. The
+    template's digest only covers its own text, which includes the fingerprinted urls
+    that `with_assets` rewrote, so it changes only with the assets the template uses.
+    If `minify` is `True`, the template's text is minified with `minify_html` when it is
+    compiled, while the values substituted into it are output unchanged.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        template_path: str | None = None,
+        assets: AssetMap | None = None,
+        dependencies: tuple[str, ...] = (),
+        minify: bool = False,
+    ):
+        self.path = template_path
+        self.dependencies = dependencies
+        self.assets = assets if assets is not None else AssetMap()
+        self.minify = minify
+        if minify:
+            text = minify_html(text)
+        self.digest = hash_bytes(text.encode("utf-8"))
+
+        self._parts = []
+        self._slots = []
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self._parts.append(text[position : match.start()])
+            self._slots.append((len(self._parts), match.group(1)))
+            self._parts.append(match.group(0))
+            position = match.end()
+        self._parts.append(text[position:])
+
+        names = [name for _, name in self._slots]
+        self._slot_names = dict(self._slots)
+        self._repeated = {name for name in names if names.count(name) > 1}
+
+    @classmethod
+    def load(
+        cls, template_path: str, root_dir: str | None = None, minify: bool = False
+    ) -> "Template":
+        """
+        Reads and compiles the template at `template_path`, along with the layouts it
+        extends and the partials it includes, whose paths are relative to `root_dir`
+        (by default the directory of `template_path`)
+        """
+        if root_dir is None:
+            root_dir = path.dirname(template_path)
+        compiler = _Compiler(root_dir)
+        text = compiler.compile(template_path)
+        return cls(text, template_path, None, tuple(compiler.dependencies), minify)
+
+    def with_assets(self, assets: AssetMap) -> "Template":
+        """
+        Returns a copy of the template whose `src` and `href` attributes point at the
+        fingerprinted copies of assets in `assets`, for rendering pages using `assets`
+        """
+        text = URL_ATTRIBUTE_PATTERN.sub(
+            lambda match: f'{match.group(1)}="{assets.resolve(match.group(2))}"',
+            "".join(self._parts),
+        )
+        return Template(text, self.path, assets, self.dependencies, self.minify)
+
+    @property
+    def placeholders(self) -> set[str]:
+        """The names of every placeholder in the template"""
+        return {name for _, name in self._slots}
+
+    def render(self, values: dict[str, str]) -> str:
+        """Returns the template with each placeholder replaced by its entry in `values`"""
+        parts = self._parts.copy()
+
+        for index, name in self._slots:
+            if name in values:
+                parts[index] = values[name]
+
+        return "".join(parts)
+
+    def stream(self, values: dict[str, str | Iterable[str]]) -> Iterator[str]:
+        """
+        Yields the rendered template in chunks. Values may be strings or iterables
+        of string chunks, such as those from `HTMLNode.iter_html`, which are passed
+        through as they are produced rather than joined first.
+        """
+        values = {
+            name: (
+                "".join(value)
+                if name in self._repeated and not isinstance(value, str)
+                else value
+            )
+            for name, value in values.items()
+        }
+
+        for index, part in enumerate(self._parts):
+            name = self._slot_names.get(index)
+            if name is None or name not in values:
+                yield part
+                continue
+
+            value = values[name]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+
+class Layouts:
+    """
+    The compiled template of each directory of a site's content, by its path relative
+    to `content_dir` (`""` for the site's own template). Pages use the template of
+    their own directory or of its nearest parent that has one.
+    """
+
+    def __init__(self, content_dir: str, templates: dict[str, Template]):
+        self.content_dir = content_dir
+        self.templates = templates
+        self._by_dir = {}
+
+    @classmethod
+    def load(
+        cls,
+        template_path: str,
+        content_dir: str,
+        layout_dirs: Iterable[str] = (),
+        minify: bool = False,
+    ) -> "Layouts":
+        """
+        Compiles the site's template at `template_path` and the `LAYOUT_NAME` file of
+        each directory in `layout_dirs`. Every template resolves the layouts and
+        partials it refers to relative to the directory of `template_path`,
+        and minifies the pages it renders if `minify` is `True`.
+        """
+        root_dir = path.dirname(template_path)
+        templates = {"": Template.load(template_path, root_dir, minify)}
+        for rel_dir in layout_dirs:
+            layout_path = path.join(content_dir, rel_dir, LAYOUT_NAME)
+            templates[rel_dir] = Template.load(layout_path, root_dir, minify)
+        return cls(content_dir, templates)
+
+    @property
+    def minify(self) -> bool:
+        """Whether the templates minify the pages they render"""
+        return self.templates[""].minify
+
+    @property
+    def assets(self) -> AssetMap:
+        """The asset map the templates resolve urls with"""
+        return self.templates[""].assets
+
+    @property
+    def dependencies(self) -> set[str]:
+        """The normalized paths of every file any of the templates was compiled from"""
+        return {
+            path.normpath(file_path)
+            for template in self.templates.values()
+            for file_path in template.dependencies
+        }
+
+    def with_assets(self, assets: AssetMap) -> "Layouts":
+        """Returns a copy of the layouts with `Template.with_assets` applied to each"""
+        return Layouts(
+            self.content_dir,
+            {
+                rel_dir: template.with_assets(assets)
+                for rel_dir, template in self.templates.items()
+            },
+        )
+
+    def for_page(self, src_path: str) -> Template:
+        """Returns the template of the page whose markdown is at `src_path`"""
+        page_dir = path.dirname(src_path)
+        template = self._by_dir.get(page_dir)
+        if template is None:
+            rel_dir = path.relpath(page_dir, self.content_dir)
+            if rel_dir == path.curdir:
+                rel_dir = ""
+            while rel_dir not in self.templates:
+                rel_dir = path.dirname(rel_dir)
+            template = self._by_dir[page_dir] = self.templates[rel_dir]
+        return template
+
+
+class _Block(NamedTuple):
+    name: str
+    children: list
+
+
+class _Include(NamedTuple):
+    template_name: str
+
+
+def _parse(text: str, template_path: str) -> tuple[str | None, list]:
+    """
+    Splits a template into the name of the layout it extends, if any,
+    and a tree of its text, blocks and includes
+    """
+    parent = None
+    tree = []
+    stack = [tree]
+    open_blocks = []
+
+    position = 0
+    for match in TAG_PATTERN.finditer(text):
+        stack[-1].append(text[position : match.start()])
+        position = match.end()
+
+        tag, quoted, name = match.groups()
+        if tag == "extends" and quoted is not None and parent is None:
+            parent = quoted
+        elif tag == "include" and quoted is not None:
+            stack[-1].append(_Include(quoted))
+        elif tag == "block" and name is not None:
+            block = _Block(name, [])
+            stack[-1].append(block)
+            stack.append(block.children)
+            open_blocks.append(name)
+        elif tag == "endblock" and open_blocks:
+            stack.pop()
+            open_blocks.pop()
+        else:
+            raise ValueError(f"Invalid tag {match.group(0)} in {template_path}")
+    stack[-1].append(text[position:])
+
+    if open_blocks:
+        raise ValueError(f"Unclosed block {open_blocks[-1]} in {template_path}")
+    return parent, tree
+
+
+def _collect_blocks(tree: list, blocks: dict[str, list]):
+    """Adds the content of every block in `tree` that is not in `blocks` already"""
+    for node in tree:
+        if isinstance(node, _Block):
+            blocks.setdefault(node.name, node.children)
+            _collect_blocks(node.children, blocks)
+
+
+class _Compiler:
+    """
+    Flattens a template into plain text by filling in the layouts it extends and
+    the partials it includes, recording each file it reads in `dependencies`
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.dependencies = []
+
+    def compile(self, template_path: str) -> str:
+        """Returns the flattened text of the template at `template_path`"""
+        return self._compile_file(template_path, {}, ())
+
+    def _compile_file(
+        self, template_path: str, overrides: dict[str, list], chain: tuple[str, ...]
+    ) -> str:
+        template_path = path.normpath(template_path)
+        if template_path in chain:
+            raise ValueError(f"Template {template_path} extends or includes itself")
+        chain = (*chain, template_path)
+
+        with open(template_path, "r", encoding="utf-8") as template_file:
+            parent, tree = _parse(template_file.read(), template_path)
+        if template_path not in self.dependencies:
+            self.dependencies.append(template_path)
+
+        if parent is None:
+            return self._compile_tree(tree, overrides, chain)
+
+        # blocks overridden further down the chain take precedence over this one's
+        blocks = dict(overrides)
+        _collect_blocks(tree, blocks)
+        return self._compile_file(path.join(self.root_dir, parent), blocks, chain)
+
+    def _compile_tree(
+        self, tree: list, overrides: dict[str, list], chain: tuple[str, ...]
+    ) -> str:
+        parts = []
+        for node in tree:
+            if isinstance(node, str):
+                parts.append(node)
+            elif isinstance(node, _Block):
+                children = overrides.get(node.name, node.children)
+                parts.append(self._compile_tree(children, overrides, chain))
+            else:
+                include_path = path.join(self.root_dir, node.template_name)
+                parts.append(self._compile_file(include_path, {}, chain))
+        return "".join(parts)
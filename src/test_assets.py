@@ -0,0 +1,171 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+import struct
+import tempfile
+import unittest
+from os import makedirs, path, remove
+from unittest import mock
+
+import assets
+from assets import AssetMap, fingerprint_assets, fingerprinted_path
+from manifest import BuildManifest
+from image_size import PNG_SIGNATURE
+from sync import sync_dir
+
+PNG = PNG_SIGNATURE + b"\x00\x00\x00\x0dIHDR" + struct.pack(">II", 64, 48)
+
+
+def write_file(file_path: str, data: bytes):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as file:
+        file.write(data)
+
+
+class TestAssetMap(unittest.TestCase):
+    def setUp(self):
+        self.assets = AssetMap(
+            {
+                "/index.css": "/index.3f9a1c2b.css",
+                "/images/logo.png": "/images/logo.0b1c2d3e.png",
+            },
+            "public",
+        )
+
+    def test_resolve_absolute_urls(self):
+        self.assertEqual(self.assets.resolve("/index.css"), "/index.3f9a1c2b.css")
+        self.assertEqual(
+            self.assets.resolve("/index.css?v=1#top"), "/index.3f9a1c2b.css?v=1#top"
+        )
+        self.assertEqual(self.assets.resolve("/about"), "/about")
+        self.assertEqual(
+            self.assets.resolve("https://example.com/index.css"),
+            "https://example.com/index.css",
+        )
+
+    def test_relative_urls_need_a_page(self):
+        self.assertEqual(self.assets.resolve("../index.css"), "../index.css")
+
+        page = self.assets.for_page(path.join("public", "blog", "post.html"))
+        self.assertEqual(page.resolve("../index.css"), "/index.3f9a1c2b.css")
+        self.assertEqual(
+            page.resolve("../images/logo.png"), "/images/logo.0b1c2d3e.png"
+        )
+        self.assertEqual(page.resolve("logo.png"), "logo.png")
+
+    def test_referenced(self):
+        page = self.assets.for_page(path.join("public", "blog", "post.html"))
+        self.assertEqual(
+            page.referenced(
+                "[a](../index.css) ![b](/images/logo.png?v=1) [c](https://x.com/a) "
+                "[d](#top) `[e](f.css)`"
+            ),
+            ["/blog/f.css", "/images/logo.png", "/index.css"],
+        )
+
+    def test_key(self):
+        page = self.assets.for_page(path.join("public", "blog", "post.html"))
+
+        self.assertEqual(AssetMap().key("![logo](logo.png)"), "")
+        self.assertEqual(page.key("[home](/about)"), "")
+        self.assertEqual(
+            page.key("![logo](/images/logo.png)"),
+            page.key("![logo](../images/logo.png)"),
+        )
+        self.assertNotEqual(page.key("![logo](/images/logo.png)"), "")
+
+    def test_key_only_tracks_linked_assets(self):
+        markdown = "![logo](/images/logo.png)"
+        key = self.assets.key(markdown)
+
+        unrelated = AssetMap({**self.assets.urls, "/other.css": "/other.1a2b3c4d.css"})
+        self.assertEqual(unrelated.key(markdown), key)
+
+        changed = AssetMap(
+            {**self.assets.urls, "/images/logo.png": "/images/logo.1.png"}
+        )
+        self.assertNotEqual(changed.key(markdown), key)
+
+
+class TestFingerprintAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.static = path.join(self.tmp.name, "static")
+        self.public = path.join(self.tmp.name, "public")
+        write_file(path.join(self.static, "index.css"), b"body {}")
+        write_file(path.join(self.static, "images", "logo.png"), PNG)
+        self.manifest = BuildManifest()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sync(self) -> AssetMap:
+        previous_assets = self.manifest.assets
+        sync_dir(self.static, self.public, self.manifest)
+        return fingerprint_assets(self.manifest, previous_assets, self.public)
+
+    def test_writes_fingerprinted_copies(self):
+        asset_map = self.sync()
+
+        css = path.join(self.public, "index.css")
+        fingerprinted = fingerprinted_path(css, self.manifest.assets[css]["hash"])
+        with open(fingerprinted, "rb") as file:
+            self.assertEqual(file.read(), b"body {}")
+        self.assertEqual(
+            asset_map.resolve("/index.css"), "/" + path.basename(fingerprinted)
+        )
+
+        with open(path.join(self.public, assets.ASSET_MANIFEST_NAME)) as file:
+            self.assertEqual(json.load(file), asset_map.urls)
+
+    def test_unchanged_assets_are_not_hashed_again(self):
+        self.sync()
+        with mock.patch.object(assets, "hash_file") as hash_file:
+            self.sync()
+        hash_file.assert_not_called()
+
+    def test_records_image_sizes(self):
+        asset_map = self.sync()
+
+        self.assertEqual(asset_map.size("/images/logo.png"), (64, 48))
+        self.assertIsNone(asset_map.size("/index.css"))
+        page = asset_map.for_page(path.join(self.public, "blog", "index.html"))
+        self.assertEqual(page.size("../images/logo.png"), (64, 48))
+
+    def test_image_sizes_are_cached_by_hash(self):
+        self.sync()
+        write_file(path.join(self.static, "images", "copy.png"), PNG)
+        with mock.patch.object(assets, "read_image_size") as read_image_size:
+            asset_map = self.sync()
+
+        read_image_size.assert_not_called()
+        self.assertEqual(asset_map.size("/images/copy.png"), (64, 48))
+
+    def test_changed_asset_replaces_fingerprint(self):
+        self.sync()
+        css = path.join(self.public, "index.css")
+        old_fingerprint = self.manifest.assets[css]["fingerprint"]
+
+        write_file(path.join(self.static, "index.css"), b"body { margin: 0 }")
+        asset_map = self.sync()
+
+        self.assertFalse(path.exists(old_fingerprint))
+        self.assertNotEqual(self.manifest.assets[css]["fingerprint"], old_fingerprint)
+        self.assertNotEqual(asset_map.resolve("/index.css"), "/index.css")
+
+    def test_deleted_asset_removes_fingerprint(self):
+        self.sync()
+        logo = path.join(self.public, "images", "logo.png")
+        fingerprint = self.manifest.assets[logo]["fingerprint"]
+
+        remove(path.join(self.static, "images", "logo.png"))
+        asset_map = self.sync()
+
+        self.assertFalse(path.exists(fingerprint))
+        self.assertEqual(asset_map.resolve("/images/logo.png"), "/images/logo.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
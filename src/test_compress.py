@@ -0,0 +1,80 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import gzip
+import tempfile
+import unittest
+from os import makedirs, path, remove, stat, utime
+
+from compress import compress_outputs, remove_sidecars, sidecar_path
+from manifest import BuildManifest
+
+
+def write_file(file_path: str, data: bytes):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as file:
+        file.write(data)
+
+
+class TestCompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        public = path.join(self.tmp.name, "public")
+        self.page = path.join(public, "index.html")
+        self.css = path.join(public, "index.css")
+        self.image = path.join(public, "logo.png")
+
+        write_file(self.page, b"<p>page</p>" * 200)
+        write_file(self.css, b"body {}")
+        write_file(self.image, b"png" * 1000)
+        self.manifest = BuildManifest(
+            pages={"index.md": {"output_path": self.page}},
+            assets={self.css: {}, self.image: {}},
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compresses_large_text_files(self):
+        compressed = compress_outputs(self.manifest, threads=2)
+
+        self.assertEqual(compressed, [self.page])
+        with gzip.open(sidecar_path(self.page)) as gz_file:
+            self.assertEqual(gz_file.read(), b"<p>page</p>" * 200)
+        self.assertFalse(path.exists(sidecar_path(self.css)))
+        self.assertFalse(path.exists(sidecar_path(self.image)))
+
+    def test_skips_unchanged_files(self):
+        compress_outputs(self.manifest)
+        self.assertEqual(compress_outputs(self.manifest), [])
+
+        write_file(self.page, b"<p>changed</p>" * 200)
+        utime(self.page, ns=(1, 1))
+        self.assertEqual(compress_outputs(self.manifest), [self.page])
+        self.assertEqual(stat(sidecar_path(self.page)).st_mtime_ns, 1)
+
+    def test_compresses_small_files_above_threshold(self):
+        compressed = compress_outputs(self.manifest, min_size=1)
+        self.assertEqual(sorted(compressed), sorted([self.page, self.css]))
+
+    def test_removes_stale_sidecars(self):
+        compress_outputs(self.manifest)
+
+        remove(self.page)
+        self.manifest.pages = {}
+        compress_outputs(self.manifest)
+
+        self.assertFalse(path.exists(sidecar_path(self.page)))
+        self.assertEqual(self.manifest.compressed, [])
+
+    def test_remove_sidecars(self):
+        compress_outputs(self.manifest)
+        remove_sidecars(self.manifest)
+
+        self.assertFalse(path.exists(sidecar_path(self.page)))
+        self.assertEqual(self.manifest.compressed, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
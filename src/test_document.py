@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from document import Heading, Section, parse_document
+from markdown_blocks import BlockType, markdown_to_html_node
+
+
+class TestDocument(unittest.TestCase):
+    markdown = """
+## Preface
+
+# The Title
+
+Some *text*
+
+## Part One
+
+### Details
+"""
+
+    def test_title(self):
+        self.assertEqual(parse_document(self.markdown).title, "The Title")
+
+    def test_no_title(self):
+        self.assertIsNone(parse_document("## Only a subheading").title)
+
+    def test_outline(self):
+        self.assertEqual(
+            parse_document(self.markdown).outline,
+            [
+                Heading(2, "Preface"),
+                Heading(1, "The Title"),
+                Heading(2, "Part One"),
+                Heading(3, "Details"),
+            ],
+        )
+
+    def test_blocks(self):
+        document = parse_document(self.markdown)
+        self.assertEqual(len(document.blocks), 5)
+        self.assertEqual(document.blocks[2].block_type, BlockType.Paragraph)
+
+    def test_html_adds_heading_anchors(self):
+        html = markdown_to_html_node(self.markdown).to_html()
+        for tag, anchor in [
+            ("h2", "preface"),
+            ("h1", "the-title"),
+            ("h2", "part-one"),
+            ("h3", "details"),
+        ]:
+            html = html.replace(f"<{tag}>", f'<{tag} id="{anchor}">', 1)
+
+        self.assertEqual("".join(parse_document(self.markdown).iter_html()), html)
+
+    def test_sections(self):
+        self.assertEqual(
+            parse_document(
+                "Intro\n\n# A *Title*\n\n* one\n* two\n\n## Title", sections=True
+            ).sections,
+            [
+                Section(None, None, "Intro"),
+                Section("a-title", "A Title", "one\ntwo"),
+                Section("title", "Title", ""),
+            ],
+        )
+
+    def test_sections_are_optional(self):
+        document = parse_document("Intro\n\n# Title")
+        self.assertIsNone(document.sections)
+        self.assertEqual(document.anchors, ["title"])
+
+    def test_duplicate_anchors(self):
+        document = parse_document("# Notes\n\n## Notes\n\n## Notes!", sections=True)
+        self.assertEqual(document.anchors, ["notes", "notes-1", "notes-2"])
+        self.assertEqual(
+            [section.anchor for section in document.sections],
+            ["notes", "notes-1", "notes-2"],
+        )
+
+    def test_links(self):
+        markdown = "# [Home](/)\n\n![logo](/logo.png) and [about](about.md#team)"
+        for _ in range(2):
+            # the second parse renders the paragraph from the block memo
+            self.assertEqual(
+                parse_document(markdown).links, ["/", "/logo.png", "about.md#team"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import path
+from unittest import mock
+
+import frontmatter
+from document import parse_document
+from frontmatter import MetadataCache, read_metadata, split_front_matter
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_yaml(self):
+        metadata, body = split_front_matter(
+            "---\n"
+            "title: Hello: World\n"
+            "date: 2024-05-01\n"
+            "draft: false\n"
+            "order: 3\n"
+            "# a comment\n"
+            "tags: [tolkien, 'fiction, fantasy']\n"
+            "authors:\n"
+            "  - Tolkien\n"
+            "  - Lewis\n"
+            "---\n"
+            "# Body"
+        )
+        self.assertEqual(
+            metadata,
+            {
+                "title": "Hello: World",
+                "date": "2024-05-01",
+                "draft": False,
+                "order": 3,
+                "tags": ["tolkien", "fiction, fantasy"],
+                "authors": ["Tolkien", "Lewis"],
+            },
+        )
+        self.assertEqual(body, "# Body")
+
+    def test_toml(self):
+        metadata, body = split_front_matter(
+            '+++\ntitle = "Home"\nweight = 1.5\ntags = ["a", "b"]\n+++\n\n# Home\n'
+        )
+        self.assertEqual(metadata, {"title": "Home", "weight": 1.5, "tags": ["a", "b"]})
+        self.assertEqual(body, "\n# Home\n")
+
+    def test_no_front_matter(self):
+        markdown = "# Home\n\n---\ntitle: not front matter\n---\n"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_malformed(self):
+        for markdown in ("---\ntitle: Home\n# Home", "---\nnot a pair\n---\n"):
+            with self.assertRaises(ValueError):
+                split_front_matter(markdown)
+
+
+class TestReadMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.page = path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text: str):
+        with open(self.page, "w", encoding="utf-8") as page_file:
+            page_file.write(text)
+
+    def test_matches_split(self):
+        self.write("+++\ntitle = 'Home'\ndate = 2024\n+++\n# Other\n")
+        self.assertEqual(read_metadata(self.page), {"title": "Home", "date": 2024})
+
+    def test_title_from_heading(self):
+        self.write("---\ndate: 2024\n---\n```\n# not a heading\n```\n\n# Home\n\nBody")
+        self.assertEqual(read_metadata(self.page), {"date": 2024, "title": "Home"})
+
+    def test_title_matches_document(self):
+        for markdown in (
+            "intro line\n# Not a heading\n\n# Real Title",
+            "  # Indented Title\n\nBody",
+            "```\n# code\n\n# still code\n```\n\n# Real Title",
+        ):
+            self.write(markdown)
+            self.assertEqual(
+                read_metadata(self.page).get("title"), parse_document(markdown).title
+            )
+
+    def test_reads_only_the_header(self):
+        # the body is not valid utf-8, so reading it would fail to decode
+        with open(self.page, "wb") as page_file:
+            page_file.write(b"# Home\n\n" + b"body\n" * 10000 + b"\xff")
+        self.assertEqual(read_metadata(self.page), {"title": "Home"})
+        with self.assertRaises(UnicodeDecodeError):
+            with open(self.page, "r", encoding="utf-8") as page_file:
+                page_file.read()
+
+
+class TestMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.page = path.join(self.tmp.name, "page.md")
+        self.state_path = path.join(self.tmp.name, "metadata.json")
+        with open(self.page, "w", encoding="utf-8") as page_file:
+            page_file.write("# Home\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_until_changed(self):
+        cache = MetadataCache(self.state_path)
+        self.assertEqual(cache.get(self.page), {"title": "Home"})
+        cache.save()
+
+        cache = MetadataCache.load(self.state_path)
+        with mock.patch.object(frontmatter, "read_metadata") as read:
+            self.assertEqual(cache.get(self.page), {"title": "Home"})
+        read.assert_not_called()
+
+        with open(self.page, "w", encoding="utf-8") as page_file:
+            page_file.write("# Changed home\n")
+        self.assertEqual(cache.get(self.page), {"title": "Changed home"})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_unchecked_entries_are_not_read_again(self):
+        cache = MetadataCache()
+        cache.get(self.page)
+        with open(self.page, "w", encoding="utf-8") as page_file:
+            page_file.write("# Changed home\n")
+
+        self.assertEqual(cache.get(self.page, check=False), {"title": "Home"})
+        self.assertEqual(cache.get(self.page), {"title": "Changed home"})
+
+    def test_retain(self):
+        cache = MetadataCache()
+        cache.get(self.page)
+        cache.retain(set())
+        self.assertEqual(cache.entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,10 @@
 # pylint: disable=missing-function-docstring
 # pylint: disable=line-too-long
 
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode, escape
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -31,6 +32,19 @@ class TestHTMLNode(unittest.TestCase):
             node.props_to_html(), ' href="https://www.boot.dev" target="_blank"'
         )
 
+    def test_props_escaped(self):
+        node = HTMLNode(tag="img", props={"alt": 'a "quoted" <tag>', "width": 640})
+        self.assertEqual(
+            node.props_to_html(), ' alt="a &quot;quoted&quot; &lt;tag&gt;" width="640"'
+        )
+
+    def test_escape(self):
+        text = "no special characters"
+        self.assertIs(escape(text), text)
+        self.assertEqual(
+            escape('if a < b && b > "c"'), "if a &lt; b &amp;&amp; b &gt; &quot;c&quot;"
+        )
+
 
 class TestLeafNode(unittest.TestCase):
     def test_no_value(self):
@@ -50,6 +64,16 @@ class TestLeafNode(unittest.TestCase):
             node2.to_html(), '<a href="https://www.google.com">Click me!</a>'
         )
 
+    def test_value_escaped(self):
+        node1 = LeafNode("code", "<div> & </div>")
+        node2 = LeafNode(None, "fish & chips")
+        node3 = LeafNode("a", "search", {"href": "/search?q=a&page=2"})
+
+        self.assertEqual(node1.to_html(), "<code>&lt;div&gt; &amp; &lt;/div&gt;</code>")
+        self.assertEqual(node2.to_html(), "fish &amp; chips")
+        self.assertEqual(node3.to_html(), '<a href="/search?q=a&amp;page=2">search</a>')
+        self.assertEqual(node3.links(), ["/search?q=a&page=2"])
+
 
 class TestParentNode(unittest.TestCase):
     def test_no_tag(self):
@@ -173,6 +197,44 @@ class TestParentNode(unittest.TestCase):
             "<p><b>Bold text</b><ol><li>a numbered list item</li><li>a second list item</li><li><i>an italicized list item</i></li></ol>Normal text<i>italic text</i><ul><li>a bullet point</li><li>another bullet point</li></ul>Normal text</p>",
         )
 
+    def test_iter_html(self):
+        node = ParentNode(
+            "p",
+            [LeafNode("b", "Bold text"), LeafNode(None, "Normal text")],
+            {"class": "intro"},
+        )
+        self.assertEqual(
+            list(node.iter_html()),
+            ['<p class="intro">', "<b>Bold text</b>", "Normal text", "</p>"],
+        )
+
+    def test_write_html(self):
+        node = ParentNode(
+            "ul",
+            [
+                ParentNode("li", [LeafNode("i", "an italicized list item")]),
+                ParentNode("li", [LeafNode(None, "a plain list item")]),
+            ],
+        )
+        file = io.StringIO()
+        node.write_html(file)
+        self.assertEqual(file.getvalue(), node.to_html())
+
+    def test_raw_node(self):
+        node = ParentNode("div", [RawNode("<p>already <b>rendered</b></p>")])
+        self.assertEqual(node.to_html(), "<div><p>already <b>rendered</b></p></div>")
+
+    def test_links(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode("a", "home", {"href": "/"}),
+                LeafNode("img", "", {"src": "/logo.png", "alt": "logo"}),
+                RawNode('<a href="/about">about</a>', "about", ("/about",)),
+            ],
+        )
+        self.assertEqual(node.links(), ["/", "/logo.png", "/about"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import struct
+import tempfile
+import unittest
+from os import path
+
+from image_size import PNG_SIGNATURE, read_image_size
+
+PNG = PNG_SIGNATURE + b"\x00\x00\x00\x0dIHDR" + struct.pack(">II", 640, 480) + b"\x08"
+GIF = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 8
+JPEG = (
+    b"\xff\xd8"
+    + b"\xff\xe0"  # APP0 segment, skipped
+    + struct.pack(">H", 16)
+    + b"JFIF\x00" * 2
+    + b"\x00" * 4
+    + b"\xff\xff\xc2"  # padded progressive start of frame
+    + struct.pack(">HBHH", 17, 8, 600, 800)
+    + b"\x03" * 10
+)
+WEBP_LOSSY = (
+    b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00"
+    + b"\x00\x00\x00\x9d\x01\x2a"
+    + struct.pack("<HH", 400, 300)
+)
+WEBP_LOSSLESS = b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2f" + (
+    (400 - 1) | ((300 - 1) << 14)
+).to_bytes(4, "little")
+WEBP_EXTENDED = (
+    b"RIFF\x00\x00\x00\x00WEBPVP8X\x00\x00\x00\x00"
+    + b"\x00" * 4
+    + (4000 - 1).to_bytes(3, "little")
+    + (3000 - 1).to_bytes(3, "little")
+)
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, data: bytes) -> tuple[int, int] | None:
+        file_path = path.join(self.tmp.name, "image")
+        with open(file_path, "wb") as file:
+            file.write(data)
+        return read_image_size(file_path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(PNG), (640, 480))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(GIF), (32, 16))
+
+    def test_jpeg(self):
+        self.assertEqual(self.size_of(JPEG), (800, 600))
+
+    def test_webp(self):
+        self.assertEqual(self.size_of(WEBP_LOSSY), (400, 300))
+        self.assertEqual(self.size_of(WEBP_LOSSLESS), (400, 300))
+        self.assertEqual(self.size_of(WEBP_EXTENDED), (4000, 3000))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.size_of(b"<svg></svg>"))
+        self.assertIsNone(self.size_of(PNG[:20]))
+        self.assertIsNone(self.size_of(JPEG[:26]))
+        self.assertIsNone(self.size_of(b""))
+
+
+if __name__ == "__main__":
+    unittest.main()
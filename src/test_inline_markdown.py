@@ -38,6 +38,76 @@ class TestInlineMarkdown(unittest.TestCase):
         text = "There is nothing special about this text"
         self.assertEqual(text_to_textnodes(text), [TextNode(text, TextType.Normal)])
 
+    def test_convert_underscore_delimiters(self):
+        text = "Some __bold__ and _italic_ text"
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("Some ", TextType.Normal),
+                TextNode("bold", TextType.Bold),
+                TextNode(" and ", TextType.Normal),
+                TextNode("italic", TextType.Italic),
+                TextNode(" text", TextType.Normal),
+            ],
+        )
+
+    def test_convert_delimiters_inside_code(self):
+        text = "Call `f(*args, **kwargs)` with [a link](https://example.com/a_b_c)"
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("Call ", TextType.Normal),
+                TextNode("f(*args, **kwargs)", TextType.Code),
+                TextNode(" with ", TextType.Normal),
+                TextNode("a link", TextType.Link, "https://example.com/a_b_c"),
+            ],
+        )
+
+    def test_convert_delimiter_before_link(self):
+        text = "See the my_module docs at [wiki](https://lotr.fandom.com/wiki/Main_Page)."
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("See the my_module docs at ", TextType.Normal),
+                TextNode("wiki", TextType.Link, "https://lotr.fandom.com/wiki/Main_Page"),
+                TextNode(".", TextType.Normal),
+            ],
+        )
+
+    def test_convert_delimiter_before_image(self):
+        self.assertEqual(
+            text_to_textnodes("2*3 and ![i](/a*b.png)"),
+            [
+                TextNode("2*3 and ", TextType.Normal),
+                TextNode("i", TextType.Image, "/a*b.png"),
+            ],
+        )
+        self.assertEqual(
+            text_to_textnodes("a * b [l](/x*y)"),
+            [
+                TextNode("a * b ", TextType.Normal),
+                TextNode("l", TextType.Link, "/x*y"),
+            ],
+        )
+
+    def test_convert_delimiter_before_code(self):
+        self.assertEqual(
+            text_to_textnodes("a_b then `c_d` and *e*"),
+            [
+                TextNode("a_b then ", TextType.Normal),
+                TextNode("c_d", TextType.Code),
+                TextNode(" and ", TextType.Normal),
+                TextNode("e", TextType.Italic),
+            ],
+        )
+
+    def test_convert_unmatched_delimiter(self):
+        text = "2 * 3 is six"
+        self.assertEqual(text_to_textnodes(text), [TextNode(text, TextType.Normal)])
+
+    def test_convert_empty_text(self):
+        self.assertEqual(text_to_textnodes(""), [TextNode("", TextType.Normal)])
+
     def test_split_nodes_code(self):
         node_with_code_block = TextNode(
             "This is text with a `code block` word", TextType.Normal
@@ -0,0 +1,111 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import path
+from unittest import mock
+
+import linkcheck
+from linkcheck import BrokenLink, SiteIndex, check_links, check_page
+from manifest import BuildManifest
+
+
+class TestCheckPage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.site = SiteIndex(
+            self.tmp.name,
+            frozenset(
+                ("/index.html", "/blog/index.html", "/blog/post.html", "/logo.png")
+            ),
+            {
+                "/index.html": frozenset(("home",)),
+                "/blog/index.html": frozenset(),
+                "/blog/post.html": frozenset(("intro", "café")),
+            },
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check(self, *links: str) -> list[str]:
+        return [link.reason for link in check_page(self.site, "/blog/post.html", links)]
+
+    def test_valid_links(self):
+        self.assertEqual(
+            self.check(
+                "/",
+                "/blog",
+                "./",
+                "../logo.png?v=2",
+                "index.html",
+                "/index.html#home",
+                "#intro",
+                "#caf%C3%A9",
+                "/logo.png#anything",
+            ),
+            [],
+        )
+
+    def test_external_links_are_not_checked(self):
+        self.assertEqual(
+            self.check("https://example.com/missing", "//cdn.example.com/x.js"), []
+        )
+
+    def test_missing_file(self):
+        self.assertEqual(
+            self.check("/missing.html", "../blog/nope/", "post"), ["missing file"] * 3
+        )
+
+    def test_missing_anchor(self):
+        self.assertEqual(
+            self.check("#outro", "/#away"),
+            ["missing anchor #outro", "missing anchor #away"],
+        )
+
+    def test_unrecorded_files_are_found_on_disk(self):
+        with open(path.join(self.tmp.name, "robots.txt"), "w", encoding="utf-8"):
+            pass
+        self.assertEqual(self.check("/robots.txt"), [])
+
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.root = path.join(self.tmp.name, "public")
+        self.manifest = BuildManifest()
+
+        for name, links in (
+            ("index", ["/about.html#team", "/logo.png"]),
+            ("about", ["/index.html#top", "/gone.html"]),
+        ):
+            src_path = path.join(self.tmp.name, f"{name}.md")
+            with open(src_path, "w", encoding="utf-8") as src_file:
+                src_file.write(name)
+            self.manifest.record(
+                src_path,
+                path.join(self.root, f"{name}.html"),
+                "",
+                links,
+                ["team"] if name == "about" else [],
+            )
+        self.manifest.assets[path.join(self.root, "logo.png")] = {"size": 1}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_check_links(self):
+        expected = [
+            BrokenLink("/about.html", "/gone.html", "missing file"),
+            BrokenLink("/about.html", "/index.html#top", "missing anchor #top"),
+        ]
+        self.assertEqual(check_links(self.manifest, self.root), expected)
+
+        with mock.patch.object(linkcheck, "MIN_PARALLEL_LINKS", 0):
+            self.assertEqual(check_links(self.manifest, self.root, jobs=2), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
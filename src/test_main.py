@@ -0,0 +1,382 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+import tempfile
+import unittest
+from os import makedirs, path, remove, stat
+from unittest import mock
+
+import main
+from assets import AssetMap
+from frontmatter import MetadataCache
+from main import (
+    PageGenerationError,
+    collect_sources,
+    generate_pages,
+    generate_pages_recursive,
+)
+from manifest import BuildManifest
+from search import SearchIndex
+from template import Layouts
+from watch import Changes
+
+
+def write_file(file_path: str, text: str):
+    if not path.exists(path.dirname(file_path)):
+        makedirs(path.dirname(file_path))
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+def read_file(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.content = path.join(self.tmp.name, "content")
+        self.public = path.join(self.tmp.name, "public")
+        self.template = path.join(self.tmp.name, "template.html")
+        self.manifest_path = path.join(self.tmp.name, ".sitegen", "manifest.json")
+
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        write_file(path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, assets: AssetMap | None = None) -> BuildManifest:
+        manifest = BuildManifest.load(self.manifest_path)
+        generate_pages_recursive(
+            self.content, self.public, self.template, manifest, assets=assets
+        )
+        manifest.remove_stale()
+        manifest.save()
+        return manifest
+
+    def test_generate(self):
+        generate_pages_recursive(self.content, self.public, self.template)
+        self.assertEqual(
+            read_file(path.join(self.public, "blog", "index.html")),
+            '<title>Blog</title><div><h1 id="blog">Blog</h1><p>Posts</p></div>',
+        )
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        output = path.join(self.public, "index.html")
+        first_mtime = stat(output).st_mtime_ns
+
+        self.build()
+        self.assertEqual(stat(output).st_mtime_ns, first_mtime)
+
+    def test_search_indexes_unchanged_pages_once(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        search = SearchIndex()
+
+        generate_pages_recursive(
+            self.content, self.public, self.template, manifest, search=search
+        )
+        self.assertEqual(
+            search.pages["/blog/index.html"],
+            {
+                "title": "Blog",
+                "headings": {"blog": "Blog"},
+                "terms": {"blog": ["blog"], "posts": ["blog"]},
+            },
+        )
+
+        with mock.patch.object(main, "generate_page") as generate_page:
+            generate_pages_recursive(
+                self.content, self.public, self.template, manifest, search=search
+            )
+        generate_page.assert_not_called()
+
+    def test_sections_only_for_search(self):
+        layouts = Layouts.load(self.template, self.content)
+        pages = [
+            (path.join(self.content, "index.md"), path.join(self.public, "a.html"))
+        ]
+
+        page = next(generate_pages(pages, layouts))
+        self.assertIsNone(page.sections)
+        self.assertEqual(page.anchors, ["home"])
+
+        page = next(generate_pages(pages, layouts, sections=True))
+        self.assertEqual(page.sections[0].text, "Welcome")
+
+    def test_changed_page_is_regenerated(self):
+        self.build()
+        write_file(path.join(self.content, "index.md"), "# Home\n\nUpdated")
+        self.build()
+        self.assertEqual(
+            read_file(path.join(self.public, "index.html")),
+            '<title>Home</title><div><h1 id="home">Home</h1><p>Updated</p></div>',
+        )
+
+    def test_template_change_regenerates_all(self):
+        self.build()
+        write_file(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        self.build()
+        self.assertTrue(
+            read_file(path.join(self.public, "index.html")).startswith("<h2>Home")
+        )
+        self.assertTrue(
+            read_file(path.join(self.public, "blog", "index.html")).startswith(
+                "<h2>Blog"
+            )
+        )
+
+    def test_asset_change_regenerates_linking_pages(self):
+        write_file(path.join(self.content, "index.md"), "# Home\n\n![logo](/logo.png)")
+        urls = {"/logo.png": "/logo.1a2b3c4d.png"}
+        self.build(AssetMap(urls, self.public))
+
+        with mock.patch.object(main, "generate_page") as generate_page:
+            self.build(AssetMap({**urls, "/new.css": "/new.5e6f7a8b.css"}, self.public))
+        generate_page.assert_not_called()
+
+        with mock.patch.object(
+            main, "generate_page", wraps=main.generate_page
+        ) as generate_page:
+            self.build(AssetMap({"/logo.png": "/logo.9c0d1e2f.png"}, self.public))
+        self.assertEqual(
+            [call.args[0] for call in generate_page.call_args_list],
+            [path.join(self.content, "index.md")],
+        )
+        self.assertIn(
+            "/logo.9c0d1e2f.png", read_file(path.join(self.public, "index.html"))
+        )
+
+    def test_directory_layout(self):
+        write_file(
+            self.template,
+            '{% include "nav.html" %}<title>{{ Title }}</title>{{ Content }}',
+        )
+        write_file(path.join(self.tmp.name, "nav.html"), "<nav></nav>")
+        write_file(
+            path.join(self.content, "blog", "template.html"),
+            "<article>{{ Content }}</article>",
+        )
+        self.build()
+        self.assertTrue(
+            read_file(path.join(self.public, "index.html")).startswith(
+                "<nav></nav><title>Home"
+            )
+        )
+        self.assertTrue(
+            read_file(path.join(self.public, "blog", "index.html")).startswith(
+                "<article>"
+            )
+        )
+
+        write_file(path.join(self.tmp.name, "nav.html"), "<nav>Home</nav>")
+        with mock.patch.object(
+            main, "generate_page", wraps=main.generate_page
+        ) as generate_page:
+            self.build()
+        self.assertEqual(
+            [call.args[0] for call in generate_page.call_args_list],
+            [path.join(self.content, "index.md")],
+        )
+
+    def test_front_matter(self):
+        write_file(self.template, "<title>{{ Title }}</title>{{ author }}|{{ tags }}")
+        write_file(
+            path.join(self.content, "index.md"),
+            "---\ntitle: Welcome\nauthor: Tolkien\ntags: [a, b]\n---\n# Home",
+        )
+        generate_pages_recursive(self.content, self.public, self.template)
+        self.assertEqual(
+            read_file(path.join(self.public, "index.html")),
+            "<title>Welcome</title>Tolkien|a, b",
+        )
+
+    def test_front_matter_is_escaped(self):
+        write_file(self.template, "<title>{{ Title }}</title>{{ description }}")
+        write_file(
+            path.join(self.content, "index.md"),
+            "---\ndescription: a < b\n---\n# Tom & Jerry",
+        )
+        generate_pages_recursive(self.content, self.public, self.template)
+        self.assertEqual(
+            read_file(path.join(self.public, "index.html")),
+            "<title>Tom &amp; Jerry</title>a &lt; b",
+        )
+
+    def test_page_list(self):
+        write_file(
+            path.join(self.content, "blog", "index.md"),
+            "+++\ndate = 2024\n+++\n# Blog\n\nPosts",
+        )
+        manifest = self.build()
+        listing_path = path.join(self.public, "pages.json")
+        with mock.patch.multiple(
+            main,
+            PUBLIC_DIR=self.public,
+            LISTING_PATH=listing_path,
+            METADATA_PATH=path.join(self.tmp.name, ".sitegen", "metadata.json"),
+        ):
+            main.write_page_list(manifest)
+            self.assertEqual(
+                json.loads(read_file(listing_path)),
+                [
+                    {"date": 2024, "title": "Blog", "url": "/blog/index.html"},
+                    {"title": "Home", "url": "/index.html"},
+                ],
+            )
+
+            with mock.patch("frontmatter.read_metadata") as read_metadata:
+                main.write_page_list(manifest)
+            read_metadata.assert_not_called()
+
+            # only the given sources are checked for changes
+            index = path.join(self.content, "index.md")
+            write_file(index, "# New home")
+            metadata = MetadataCache.load(main.METADATA_PATH)
+            listing = main.write_page_list(manifest, metadata, set())
+            self.assertEqual(listing[1]["title"], "Home")
+            listing = main.write_page_list(manifest, metadata, {index})
+            self.assertEqual(listing[1]["title"], "New home")
+
+            remove(path.join(self.content, "blog", "index.md"))
+            self.assertEqual(
+                main.write_page_list(manifest),
+                [{"title": "New home", "url": "/index.html"}],
+            )
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        remove(path.join(self.content, "blog", "index.md"))
+        manifest = self.build()
+        self.assertFalse(path.exists(path.join(self.public, "blog", "index.html")))
+        self.assertEqual(list(manifest.pages), [path.join(self.content, "index.md")])
+
+    def test_unchanged_sources_are_statted_once(self):
+        self.build()
+        with mock.patch("manifest.stat") as manifest_stat:
+            self.build()
+        manifest_stat.assert_not_called()
+
+    def test_deleted_output_is_regenerated(self):
+        self.build()
+        remove(path.join(self.public, "blog", "index.html"))
+        self.build()
+        self.assertTrue(path.exists(path.join(self.public, "blog", "index.html")))
+
+    def test_collect_sources(self):
+        write_file(path.join(self.content, "blog", "template.html"), "{{ Content }}")
+        sources = collect_sources(self.content, self.public)
+        self.assertEqual(sources.layout_dirs, ["blog"])
+        self.assertEqual(
+            {src_path: entry.path for src_path, entry in sources.entries.items()},
+            {src_path: src_path for src_path, _ in sources.pages},
+        )
+        self.assertEqual(
+            sorted(sources.pages),
+            [
+                (
+                    path.join(self.content, "blog", "index.md"),
+                    path.join(self.public, "blog", "index.html"),
+                ),
+                (
+                    path.join(self.content, "index.md"),
+                    path.join(self.public, "index.html"),
+                ),
+            ],
+        )
+
+    def test_parallel_matches_serial(self):
+        for i in range(8):
+            write_file(
+                path.join(self.content, "posts", f"{i}.md"),
+                f"# Post {i}\n\nSome *text* for post {i}",
+            )
+        parallel = path.join(self.tmp.name, "parallel")
+
+        generate_pages_recursive(self.content, self.public, self.template)
+        generate_pages_recursive(self.content, parallel, self.template, jobs=3)
+
+        for _, dst_path in collect_sources(self.content, self.public).pages:
+            parallel_path = path.join(parallel, path.relpath(dst_path, self.public))
+            self.assertEqual(read_file(parallel_path), read_file(dst_path))
+
+    def test_error_names_source(self):
+        broken = path.join(self.content, "broken.md")
+        write_file(broken, "This page has no title")
+
+        for jobs in (1, 2):
+            with self.assertRaises(PageGenerationError) as context:
+                generate_pages_recursive(
+                    self.content, self.public, self.template, jobs=jobs
+                )
+            self.assertEqual(context.exception.src_path, broken)
+            self.assertIn(broken, str(context.exception))
+
+
+class TestRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.content = path.join(self.tmp.name, "content")
+        self.public = path.join(self.tmp.name, "public")
+        self.template = path.join(self.tmp.name, "template.html")
+        self.index = path.join(self.content, "index.md")
+        self.blog = path.join(self.content, "blog", "index.md")
+
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(self.index, "# Home\n\nWelcome")
+        write_file(self.blog, "# Blog\n\nPosts")
+
+        patcher = mock.patch.multiple(
+            main,
+            CONTENT_DIR=self.content,
+            PUBLIC_DIR=self.public,
+            TEMPLATE_PATH=self.template,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.manifest = BuildManifest()
+        self.layouts = generate_pages_recursive(
+            self.content, self.public, self.template, self.manifest
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_changed_page(self):
+        write_file(self.index, "# Home\n\nUpdated")
+        with mock.patch.object(
+            main, "generate_page", wraps=main.generate_page
+        ) as generate_page:
+            main.rebuild(Changes([self.index], []), self.manifest, self.layouts)
+
+        self.assertEqual(generate_page.call_count, 1)
+        self.assertIn("Updated", read_file(path.join(self.public, "index.html")))
+
+    def test_removed_page(self):
+        remove(self.blog)
+        main.rebuild(Changes([], [self.blog]), self.manifest, self.layouts)
+
+        self.assertFalse(path.exists(path.join(self.public, "blog", "index.html")))
+        self.assertEqual(list(self.manifest.pages), [self.index])
+
+    def test_removed_page_with_template_change(self):
+        remove(self.blog)
+        write_file(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        main.rebuild(Changes([self.template], [self.blog]), self.manifest, self.layouts)
+
+        self.assertFalse(path.exists(path.join(self.public, "blog", "index.html")))
+        self.assertEqual(list(self.manifest.pages), [self.index])
+        self.assertTrue(
+            read_file(path.join(self.public, "index.html")).startswith("<h2>Home")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
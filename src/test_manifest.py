@@ -0,0 +1,85 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import path
+
+from manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.src = path.join(self.tmp.name, "index.md")
+        self.dst = path.join(self.tmp.name, "index.html")
+        self.manifest_path = path.join(self.tmp.name, ".sitegen", "manifest.json")
+        with open(self.src, "w", encoding="utf-8") as src_file:
+            src_file.write("# Title")
+        with open(self.dst, "w", encoding="utf-8") as dst_file:
+            dst_file.write("<h1>Title</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unrecorded_page_is_not_current(self):
+        manifest = BuildManifest()
+        self.assertFalse(manifest.is_current(self.src, self.dst, "template"))
+
+    def test_recorded_page_is_current(self):
+        manifest = BuildManifest()
+        manifest.record(self.src, self.dst, "template")
+        self.assertTrue(manifest.is_current(self.src, self.dst, "template"))
+
+    def test_template_change_invalidates(self):
+        manifest = BuildManifest()
+        manifest.record(self.src, self.dst, "template")
+        self.assertFalse(manifest.is_current(self.src, self.dst, "new template"))
+
+    def test_source_change_invalidates(self):
+        manifest = BuildManifest()
+        manifest.record(self.src, self.dst, "template")
+        with open(self.src, "w", encoding="utf-8") as src_file:
+            src_file.write("# A different title")
+        self.assertFalse(manifest.is_current(self.src, self.dst, "template"))
+
+    def test_touched_but_unchanged_source_is_current(self):
+        manifest = BuildManifest()
+        manifest.record(self.src, self.dst, "template")
+        manifest.pages[self.src]["mtime"] = 0
+        self.assertTrue(manifest.is_current(self.src, self.dst, "template"))
+        self.assertEqual(manifest.pages[self.src]["source_hash"], hash_file(self.src))
+
+    def test_missing_output_is_not_current(self):
+        manifest = BuildManifest()
+        manifest.record(self.src, self.dst, "template")
+        manifest.record(self.src, self.dst + ".missing", "template")
+        self.assertFalse(
+            manifest.is_current(self.src, self.dst + ".missing", "template")
+        )
+
+    def test_save_and_load(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.src, self.dst, "template")
+        manifest.save()
+
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.pages, manifest.pages)
+        self.assertTrue(loaded.is_current(self.src, self.dst, "template"))
+
+    def test_load_missing(self):
+        self.assertEqual(BuildManifest.load(self.manifest_path).pages, {})
+
+    def test_remove_stale(self):
+        manifest = BuildManifest()
+        manifest.record(self.src, self.dst, "template")
+
+        next_build = BuildManifest(pages=manifest.pages)
+        self.assertEqual(next_build.remove_stale(), [self.dst])
+        self.assertFalse(path.exists(self.dst))
+        self.assertEqual(next_build.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,8 @@
 import unittest
 
 from htmlnode import LeafNode, ParentNode
-from markdown_blocks import (BlockType, get_block_type, markdown_to_blocks,
+from markdown_blocks import (Block, BlockMemo, BlockType, block_to_html_node,
+                             get_block_type, iter_blocks, markdown_to_blocks,
                              markdown_to_html_node)
 
 
@@ -41,6 +42,57 @@ Some of those lines have extra whitespace"""
             ],
         )
 
+    def test_iter_blocks(self):
+        markdown = """
+# Heading
+
+> a quote
+> over two lines
+
+1. first
+2. second
+"""
+        self.assertEqual(
+            list(iter_blocks(markdown)),
+            [
+                Block(BlockType.Heading, ["# Heading"]),
+                Block(BlockType.Quote, ["> a quote", "> over two lines"]),
+                Block(BlockType.OrderedList, ["1. first", "2. second"]),
+            ],
+        )
+
+    def test_fenced_code_with_blank_lines(self):
+        markdown = """
+```
+def f():
+
+    return 1
+```
+
+after the code
+"""
+        self.assertEqual(
+            list(iter_blocks(markdown)),
+            [
+                Block(BlockType.Code, ["```", "def f():", "", "    return 1", "```"]),
+                Block(BlockType.Paragraph, ["after the code"]),
+            ],
+        )
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><pre><code>def f():\n\n    return 1</code></pre><p>after the code</p></div>",
+        )
+
+    def test_unclosed_fence(self):
+        markdown = "```\nnot closed\n\n* a list"
+        self.assertEqual(
+            list(iter_blocks(markdown)),
+            [
+                Block(BlockType.Paragraph, ["```", "not closed"]),
+                Block(BlockType.UnorderedList, ["* a list"]),
+            ],
+        )
+
     def test_block_type(self):
         blocks = [
             (
@@ -193,5 +245,49 @@ a paragraph of normal text
         self.assertEqual(markdown_to_html_node(markdown).to_html(), html_node.to_html())
 
 
+class TestBlockMemo(unittest.TestCase):
+    def test_repeated_block_is_rendered_once(self):
+        memo = BlockMemo()
+        block = Block(BlockType.UnorderedList, ["* see **also**", "* the index"])
+
+        first = memo.render(block)
+        second = memo.render(Block(BlockType.UnorderedList, list(block.lines)))
+
+        self.assertIs(first, second)
+        self.assertEqual(first.to_html(), block_to_html_node(block).to_html())
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+
+    def test_key_includes_block_type(self):
+        memo = BlockMemo()
+        memo.render(Block(BlockType.Paragraph, ["> quoted"]))
+        quote = memo.render(Block(BlockType.Quote, ["> quoted"]))
+
+        self.assertEqual(quote.to_html(), "<blockquote>quoted</blockquote>")
+        self.assertEqual(memo.misses, 2)
+
+    def test_least_recently_used_block_is_forgotten(self):
+        memo = BlockMemo(max_entries=2)
+        first = Block(BlockType.Paragraph, ["first"])
+        second = Block(BlockType.Paragraph, ["second"])
+        third = Block(BlockType.Paragraph, ["third"])
+
+        memo.render(first)
+        memo.render(second)
+        memo.render(first)
+        memo.render(third)
+        self.assertEqual(len(memo), 2)
+
+        memo.render(first)
+        memo.render(second)
+        self.assertEqual((memo.hits, memo.misses), (2, 4))
+
+    def test_disabled_memo(self):
+        memo = BlockMemo(max_entries=0)
+        block = Block(BlockType.Paragraph, ["text"])
+
+        self.assertEqual(memo.render(block).to_html(), "<p>text</p>")
+        self.assertEqual((len(memo), memo.hits, memo.misses), (0, 0, 0))
+
+
 if __name__ == "__main__":
     unittest.main()
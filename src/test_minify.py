@@ -0,0 +1,67 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from minify import HTMLMinifier, minify_chunks, minify_html
+
+PAGE = """<!doctype html>
+<html>
+  <head>
+    <title>Home</title>
+    <style>
+      body  { margin: 0 }
+    </style>
+  </head>
+  <body>
+    <article><div><p>Some   <b>bold</b>
+      <i>text</i>&nbsp;\xa0 here</p><pre><code>keep
+    this   <b>as is</b>
+</code></pre><p>inline <code>a   b</code> <a title="x > y" href="/">link</a></p>
+    <textarea>  raw  </textarea></div></article>
+    <!-- a comment -->
+  </body>
+</html>
+"""
+
+MINIFIED = (
+    "<!doctype html><html><head><title>Home</title><style>\n"
+    "      body  { margin: 0 }\n"
+    "    </style></head><body><article><div><p>Some <b>bold</b> <i>text</i>"
+    "&nbsp;\xa0 here</p><pre><code>keep\n"
+    "    this   <b>as is</b>\n"
+    "</code></pre><p>inline <code>a   b</code> "
+    '<a title="x > y" href="/">link</a></p>'
+    "<textarea>  raw  </textarea></div></article><!-- a comment --></body></html>"
+)
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify(self):
+        self.assertEqual(minify_html(PAGE), MINIFIED)
+
+    def test_chunks_may_split_anywhere(self):
+        for size in (1, 2, 3, 7, 64):
+            chunks = [PAGE[i : i + size] for i in range(0, len(PAGE), size)]
+            for batch_size in (1, 10, 100):
+                self.assertEqual("".join(minify_chunks(chunks, batch_size)), MINIFIED)
+
+    def test_inline_whitespace_is_kept(self):
+        self.assertEqual(minify_html("<b>a</b>\n  <i>b</i> c "), "<b>a</b> <i>b</i> c ")
+
+    def test_unclosed_raw_element(self):
+        self.assertEqual(minify_html("<pre>  a\n  b"), "<pre>  a\n  b")
+
+    def test_raw_content_is_passed_through(self):
+        minifier = HTMLMinifier(batch_size=8)
+        # the content is written before the element closes, except for a possible
+        # start of the closing tag
+        self.assertEqual(minifier.feed("<pre>  a < b  </p"), "<pre>  a < b  ")
+        self.assertEqual(minifier.feed("re>  <p>"), "</pre><p>")
+        self.assertEqual(minifier.feed(" c </p>"), "")
+        self.assertEqual(minifier.close(), "c</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import listdir, path, stat, utime
+
+from output import load_state, save_state, write_if_changed
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.dst = path.join(self.tmp.name, "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self) -> str:
+        with open(self.dst, encoding="utf-8") as file:
+            return file.read()
+
+    def test_writes_new_file(self):
+        self.assertTrue(write_if_changed(self.dst, ["<p>", "héllo", "</p>"]))
+        self.assertEqual(self.read(), "<p>héllo</p>")
+
+    def test_skips_identical_content(self):
+        write_if_changed(self.dst, ["<p>hello</p>"])
+        utime(self.dst, ns=(1, 1))
+
+        self.assertFalse(write_if_changed(self.dst, ["<p>", "hello", "</p>"]))
+        self.assertEqual(stat(self.dst).st_mtime_ns, 1)
+
+    def test_replaces_changed_content(self):
+        write_if_changed(self.dst, ["<p>hello</p>"])
+
+        self.assertTrue(write_if_changed(self.dst, ["<p>", "hello", "!</p>"]))
+        self.assertEqual(self.read(), "<p>hello!</p>")
+
+    def test_replaces_longer_and_shorter_content(self):
+        write_if_changed(self.dst, ["<p>hello</p>"])
+
+        self.assertTrue(write_if_changed(self.dst, ["<p>hello</p>", "<p>again</p>"]))
+        self.assertEqual(self.read(), "<p>hello</p><p>again</p>")
+        self.assertTrue(write_if_changed(self.dst, ["<p>hello</p>"]))
+        self.assertEqual(self.read(), "<p>hello</p>")
+
+    def test_failure_keeps_existing_file(self):
+        write_if_changed(self.dst, ["<p>hello</p>"])
+
+        def chunks():
+            yield "<p>goodbye"
+            raise ValueError("rendering failed")
+
+        self.assertRaises(ValueError, write_if_changed, self.dst, chunks())
+        self.assertEqual(self.read(), "<p>hello</p>")
+        self.assertEqual(listdir(self.tmp.name), ["index.html"])
+
+
+class TestState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.state_path = path.join(self.tmp.name, ".sitegen", "state.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        save_state(self.state_path, 2, {"pages": {"a.md": 1}})
+        self.assertEqual(
+            load_state(self.state_path, 2), {"version": 2, "pages": {"a.md": 1}}
+        )
+        self.assertEqual(listdir(path.dirname(self.state_path)), ["state.json"])
+
+    def test_unusable_state(self):
+        self.assertIsNone(load_state(self.state_path, 1))
+
+        save_state(self.state_path, 1, {})
+        self.assertIsNone(load_state(self.state_path, 2))
+
+        with open(self.state_path, "w", encoding="utf-8") as state_file:
+            state_file.write("{not json")
+        self.assertIsNone(load_state(self.state_path, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
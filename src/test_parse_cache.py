@@ -0,0 +1,86 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import path, utime
+
+from document import Heading
+from parse_cache import CachedDocument, ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    markdown = "# Title\n\nSome *text*\n\n## Section"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache_dir = path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        cache = ParseCache(self.cache_dir)
+        first = cache.parse(self.markdown)
+        second = ParseCache(self.cache_dir).parse(self.markdown)
+
+        self.assertEqual(first, second)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(second.title, "Title")
+        self.assertEqual(second.outline, [Heading(1, "Title"), Heading(2, "Section")])
+        self.assertEqual(
+            "".join(second.iter_html()),
+            '<div><h1 id="title">Title</h1><p>Some <i>text</i></p><h2 id="section">Section</h2></div>',
+        )
+
+    def test_hit(self):
+        cache = ParseCache(self.cache_dir)
+        cache.parse(self.markdown)
+        cache.parse(self.markdown)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_sections_only_when_asked(self):
+        cache = ParseCache(self.cache_dir)
+        self.assertIsNone(cache.parse(self.markdown).sections)
+        self.assertEqual(cache.misses, 1)
+
+        # an entry without sections is parsed again when they are needed
+        sections = cache.parse(self.markdown, sections=True).sections
+        self.assertEqual([section.anchor for section in sections], ["title", "section"])
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.parse(self.markdown).sections, sections)
+        self.assertEqual(cache.hits, 1)
+
+    def test_key_depends_on_markdown(self):
+        self.assertEqual(ParseCache.key("# a"), ParseCache.key("# a"))
+        self.assertNotEqual(ParseCache.key("# a"), ParseCache.key("# b"))
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ParseCache(self.cache_dir)
+        key = cache.key(self.markdown)
+        cache.put(key, CachedDocument("Title", [], "<div></div>", [], [], []))
+        with open(path.join(self.cache_dir, key[:2], key), "wb") as entry_file:
+            entry_file.write(b"not a cache entry")
+
+        self.assertIsNone(cache.get(key))
+
+    def test_evict_least_recently_used(self):
+        cache = ParseCache(self.cache_dir)
+        keys = [cache.key(f"# Page {i}") for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, CachedDocument(f"Page {i}", [], "x" * 1000, [], [], []))
+            entry_path = path.join(self.cache_dir, key[:2], key)
+            utime(entry_path, ns=(i * 10**9, i * 10**9))
+
+        entry_size = path.getsize(path.join(self.cache_dir, keys[0][:2], keys[0]))
+        cache.max_bytes = entry_size * 2
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertIsNotNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from profiling import NULL_CONTEXT, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_does_nothing(self):
+        profiler = Profiler()
+        self.assertIs(profiler.stage("read"), NULL_CONTEXT)
+        self.assertIs(profiler.page("index.md"), NULL_CONTEXT)
+        profiler.count("pages")
+        self.assertEqual(profiler.take()["counters"], {})
+
+    def test_stages_and_counters(self):
+        profiler = Profiler()
+        profiler.enabled = True
+        for _ in range(3):
+            with profiler.stage("read"):
+                pass
+        profiler.count("pages", 2)
+
+        self.assertEqual(profiler.stage_calls["read"], 3)
+        self.assertGreaterEqual(profiler.stage_times["read"], 0)
+        self.assertEqual(profiler.counters["pages"], 2)
+
+    def test_slowest_pages(self):
+        profiler = Profiler()
+        profiler.page_times = {"a.md": 0.1, "b.md": 0.3, "c.md": 0.2}
+        self.assertEqual(profiler.slowest_pages(2), [("b.md", 0.3), ("c.md", 0.2)])
+
+    def test_take_and_merge(self):
+        worker = Profiler()
+        worker.enabled = True
+        with worker.stage("inline"):
+            pass
+        with worker.page("a.md"):
+            pass
+        worker.count("pages")
+
+        parent = Profiler()
+        parent.merge(worker.take())
+        parent.merge(worker.take())
+
+        self.assertEqual(parent.stage_calls["inline"], 1)
+        self.assertEqual(parent.counters["pages"], 1)
+        self.assertEqual(list(parent.page_times), ["a.md"])
+
+    def test_report(self):
+        profiler = Profiler()
+        profiler.enabled = True
+        with profiler.stage("write"):
+            pass
+        with profiler.page("index.md"):
+            pass
+        report = profiler.report()
+        self.assertIn("write", report)
+        self.assertIn("index.md", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+import tempfile
+import unittest
+from os import listdir, makedirs, path, remove
+
+from document import Section
+from search import PAGES_NAME, SearchIndex, page_terms, remove_index
+
+
+class TestPageTerms(unittest.TestCase):
+    def test_terms_record_section_anchors(self):
+        terms = page_terms(
+            [
+                Section(None, None, "The ring"),
+                Section("forging", "Forging", "The Ring was forged. A ring!"),
+            ]
+        )
+        self.assertEqual(terms["ring"], ["", "forging"])
+        self.assertEqual(terms["forging"], ["forging"])
+        self.assertEqual(terms["forged"], ["forging"])
+        self.assertNotIn("a", terms)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.state_path = path.join(self.tmp.name, "search.json")
+        self.index_dir = path.join(self.tmp.name, "search")
+        self.index = SearchIndex(self.state_path)
+        self.index.update("/rings.html", "Rings", [Section(None, None, "ring power")])
+        self.index.update("/elves.html", "Elves", [Section("lore", "Lore", "elf ring")])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_shard(self, prefix: str) -> dict:
+        with open(
+            path.join(self.index_dir, f"{prefix}.json"), encoding="utf-8"
+        ) as file:
+            return json.load(file)
+
+    def test_write(self):
+        self.index.write(self.index_dir)
+
+        self.assertEqual(
+            self.read_shard("ri")["ring"],
+            {"/rings.html": [""], "/elves.html": ["lore"]},
+        )
+        self.assertEqual(self.read_shard("po"), {"power": {"/rings.html": [""]}})
+        with open(path.join(self.index_dir, PAGES_NAME), encoding="utf-8") as file:
+            self.assertEqual(
+                json.load(file)["/elves.html"],
+                {"title": "Elves", "headings": {"lore": "Lore"}},
+            )
+
+    def test_only_changed_shards_are_rewritten(self):
+        self.index.write(self.index_dir)
+        self.index.save()
+
+        index = SearchIndex.load(self.state_path)
+        index.update("/rings.html", "Rings", [Section(None, None, "ring power")])
+        self.assertEqual(index.write(self.index_dir), [])
+
+        index.update("/rings.html", "Rings", [Section(None, None, "ring might")])
+        written = index.write(self.index_dir)
+
+        self.assertEqual(
+            sorted(written),
+            [
+                path.join(self.index_dir, "mi.json"),
+                path.join(self.index_dir, "po.json"),
+            ],
+        )
+        self.assertFalse(path.exists(path.join(self.index_dir, "po.json")))
+        self.assertEqual(self.read_shard("mi"), {"might": {"/rings.html": [""]}})
+        self.assertEqual(
+            self.read_shard("ri")["ring"],
+            {"/rings.html": [""], "/elves.html": ["lore"]},
+        )
+
+    def test_retain_removes_pages(self):
+        self.index.write(self.index_dir)
+        self.index.retain({"/elves.html"})
+        self.index.write(self.index_dir)
+
+        self.assertEqual(self.read_shard("ri"), {"ring": {"/elves.html": ["lore"]}})
+        self.assertFalse(path.exists(path.join(self.index_dir, "po.json")))
+
+    def test_missing_shard_is_rebuilt(self):
+        self.index.write(self.index_dir)
+        remove(path.join(self.index_dir, "ri.json"))
+
+        self.index.update("/rings.html", "Rings", [Section(None, None, "ring")])
+        self.index.write(self.index_dir)
+
+        self.assertEqual(
+            self.read_shard("ri")["ring"],
+            {"/rings.html": [""], "/elves.html": ["lore"]},
+        )
+
+    def test_rebuild_keeps_other_files(self):
+        makedirs(self.index_dir)
+        for file_name in ("index.html", "data.json", "zz.json"):
+            with open(path.join(self.index_dir, file_name), "w", encoding="utf-8"):
+                pass
+
+        self.index.write(self.index_dir)
+        self.assertNotIn("zz.json", listdir(self.index_dir))
+        self.assertIn("data.json", listdir(self.index_dir))
+
+        remove_index(self.index_dir)
+        self.assertEqual(sorted(listdir(self.index_dir)), ["data.json", "index.html"])
+
+    def test_remove_index(self):
+        self.index.write(self.index_dir)
+        remove_index(self.index_dir)
+        self.assertFalse(path.exists(self.index_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import makedirs, path, remove, stat, utime
+from unittest import mock
+
+import sync
+from manifest import BuildManifest
+from sync import sync_dir
+
+
+def write_file(file_path: str, data: bytes):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as file:
+        file.write(data)
+
+
+class TestSyncDir(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.static = path.join(self.tmp.name, "static")
+        self.public = path.join(self.tmp.name, "public")
+        write_file(path.join(self.static, "index.css"), b"body {}")
+        write_file(path.join(self.static, "images", "logo.png"), b"png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_copies_new_files(self):
+        manifest = BuildManifest()
+        result = sync_dir(self.static, self.public, manifest)
+
+        self.assertEqual(len(result.copied), 2)
+        self.assertTrue(path.exists(path.join(self.public, "images", "logo.png")))
+        self.assertEqual(len(manifest.assets), 2)
+
+    def test_skips_unchanged_files(self):
+        manifest = BuildManifest()
+        sync_dir(self.static, self.public, manifest)
+        self.assertEqual(sync_dir(self.static, self.public, manifest).copied, [])
+
+    def test_copies_changed_files(self):
+        manifest = BuildManifest()
+        sync_dir(self.static, self.public, manifest)
+        write_file(path.join(self.static, "index.css"), b"body { margin: 0 }")
+
+        result = sync_dir(self.static, self.public, manifest)
+        self.assertEqual(result.copied, [path.join(self.public, "index.css")])
+
+    def test_checksum_skips_touched_files(self):
+        manifest = BuildManifest()
+        sync_dir(self.static, self.public, manifest)
+        utime(path.join(self.static, "index.css"), ns=(0, 0))
+
+        result = sync_dir(self.static, self.public, manifest, checksum=True)
+        self.assertEqual(result.copied, [])
+        self.assertEqual(stat(path.join(self.public, "index.css")).st_mtime_ns, 0)
+
+    def test_removes_deleted_sources_only(self):
+        manifest = BuildManifest()
+        sync_dir(self.static, self.public, manifest)
+        write_file(path.join(self.public, "index.html"), b"<p>generated</p>")
+        remove(path.join(self.static, "images", "logo.png"))
+
+        result = sync_dir(self.static, self.public, manifest)
+        self.assertEqual(result.removed, [path.join(self.public, "images", "logo.png")])
+        self.assertFalse(path.exists(path.join(self.public, "images")))
+        self.assertTrue(path.exists(path.join(self.public, "index.html")))
+
+    def test_hardlinks_large_files(self):
+        with mock.patch.object(sync, "LINK_THRESHOLD", 1):
+            sync_dir(self.static, self.public, BuildManifest())
+
+        src_stat = stat(path.join(self.static, "index.css"))
+        dst_stat = stat(path.join(self.public, "index.css"))
+        self.assertEqual(src_stat.st_ino, dst_stat.st_ino)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import makedirs, path
+
+from assets import AssetMap
+from template import Layouts, Template
+
+
+def write_file(file_path: str, text: str):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template(
+            "<title>{{ Title }}</title><article>{{ Content }}</article>"
+        )
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>Welcome</p>"}),
+            "<title>Home</title><article><p>Welcome</p></article>",
+        )
+
+    def test_placeholders(self):
+        template = Template("{{ Title }} {{Author}} {{  Date  }} {{ Title }}")
+        self.assertEqual(template.placeholders, {"Title", "Author", "Date"})
+
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }} | {{ Title }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home | Home")
+
+    def test_missing_value_is_left_alone(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "Home"}), "<h1>Home</h1>{{ Content }}"
+        )
+
+    def test_values_are_not_rescanned(self):
+        template = Template("{{ Title }}{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "{{ Content }}", "Content": "body"}),
+            "{{ Content }}body",
+        )
+
+    def test_no_placeholders(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render({"Title": "unused"}), "<p>static</p>")
+
+    def test_digest_tracks_text(self):
+        self.assertEqual(Template("a").digest, Template("a").digest)
+        self.assertNotEqual(Template("a").digest, Template("b").digest)
+
+    def test_stream(self):
+        template = Template("<h1>{{ Title }}</h1><article>{{ Content }}</article>")
+        chunks = list(
+            template.stream({"Title": "Home", "Content": iter(["<p>", "hi", "</p>"])})
+        )
+        self.assertEqual(
+            chunks,
+            ["<h1>", "Home", "</h1><article>", "<p>", "hi", "</p>", "</article>"],
+        )
+
+    def test_stream_repeated_iterable(self):
+        template = Template("{{ Content }}|{{ Content }}")
+        self.assertEqual(
+            "".join(template.stream({"Content": iter(["a", "b"])})), "ab|ab"
+        )
+
+    def test_with_assets(self):
+        template = Template(
+            '<link href="/index.css" /><a href="/about">{{ Title }}</a>',
+            "template.html",
+        )
+        assets = AssetMap({"/index.css": "/index.3f9a1c2b.css"}, "public")
+        fingerprinted = template.with_assets(assets)
+
+        self.assertEqual(
+            fingerprinted.render({"Title": "About"}),
+            '<link href="/index.3f9a1c2b.css" /><a href="/about">About</a>',
+        )
+        self.assertIs(fingerprinted.assets, assets)
+        self.assertEqual(fingerprinted.path, "template.html")
+        self.assertNotEqual(fingerprinted.digest, template.digest)
+
+    def test_minify(self):
+        text = "<div>\n  <p>{{ Content }}</p>\n</div>\n"
+        template = Template(text, minify=True)
+        # only the template's own text is minified
+        self.assertEqual(
+            "".join(template.stream({"Content": iter(["a  ", " b"])})),
+            "<div><p>a   b</p></div>",
+        )
+        self.assertEqual(template.render({"Content": "c"}), "<div><p>c</p></div>")
+        self.assertNotEqual(template.digest, Template(text).digest)
+        self.assertTrue(template.with_assets(AssetMap()).minify)
+
+
+class TestLayouts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.root = self.tmp.name
+        self.content = path.join(self.root, "content")
+        self.template = path.join(self.root, "template.html")
+
+        write_file(
+            self.template,
+            '{% include "partials/header.html" %}'
+            "<main>{% block main %}{{ Content }}{% endblock %}</main>"
+            "{% block footer %}<footer>Site</footer>{% endblock %}",
+        )
+        write_file(
+            path.join(self.root, "partials", "header.html"), "<h1>{{ Title }}</h1>"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_include(self):
+        template = Template.load(self.template)
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>Hi</p>"}),
+            "<h1>Home</h1><main><p>Hi</p></main><footer>Site</footer>",
+        )
+        self.assertEqual(
+            template.dependencies,
+            (self.template, path.join(self.root, "partials", "header.html")),
+        )
+
+    def test_extends_overrides_blocks(self):
+        layout = path.join(self.content, "blog", "template.html")
+        write_file(
+            layout,
+            '{% extends "template.html" %}'
+            "ignored{% block main %}<article>{{ Content }}</article>{% endblock %}",
+        )
+        template = Template.load(layout, self.root)
+        self.assertEqual(
+            template.render({"Title": "Blog", "Content": "posts"}),
+            "<h1>Blog</h1><main><article>posts</article></main><footer>Site</footer>",
+        )
+        self.assertIn(self.template, template.dependencies)
+
+    def test_nearest_layout(self):
+        write_file(
+            path.join(self.content, "blog", "template.html"),
+            '{% extends "template.html" %}{% block footer %}{% endblock %}',
+        )
+        layouts = Layouts.load(self.template, self.content, ["blog"])
+
+        self.assertEqual(
+            layouts.for_page(path.join(self.content, "a.md")).path, self.template
+        )
+        self.assertEqual(
+            layouts.for_page(path.join(self.content, "blog", "2024", "b.md")).path,
+            path.join(self.content, "blog", "template.html"),
+        )
+        self.assertEqual(
+            layouts.dependencies,
+            {
+                self.template,
+                path.join(self.root, "partials", "header.html"),
+                path.join(self.content, "blog", "template.html"),
+            },
+        )
+
+    def test_partial_change_only_changes_its_dependents(self):
+        write_file(path.join(self.root, "plain.html"), "{{ Content }}")
+        write_file(
+            path.join(self.content, "plain", "template.html"),
+            '{% include "plain.html" %}',
+        )
+        before = Layouts.load(self.template, self.content, ["plain"])
+        write_file(
+            path.join(self.root, "partials", "header.html"), "<h2>{{ Title }}</h2>"
+        )
+        after = Layouts.load(self.template, self.content, ["plain"])
+
+        self.assertNotEqual(after.templates[""].digest, before.templates[""].digest)
+        self.assertEqual(
+            after.templates["plain"].digest, before.templates["plain"].digest
+        )
+
+    def test_cycle(self):
+        write_file(path.join(self.root, "a.html"), '{% include "b.html" %}')
+        write_file(path.join(self.root, "b.html"), '{% extends "a.html" %}')
+        with self.assertRaises(ValueError):
+            Template.load(path.join(self.root, "a.html"))
+
+    def test_invalid_tags(self):
+        for text in (
+            "{% block %}",
+            "{% block main %}",
+            "{% endblock %}",
+            "{% for x %}",
+        ):
+            write_file(path.join(self.root, "bad.html"), text)
+            with self.assertRaises(ValueError):
+                Template.load(path.join(self.root, "bad.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
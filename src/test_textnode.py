@@ -4,6 +4,7 @@
 
 import unittest
 
+from assets import AssetMap
 from textnode import TextNode, TextType
 
 
@@ -86,6 +87,24 @@ class TestTextNode(unittest.TestCase):
             '<img src="https://bit.ly/4bx5bzq" alt="Autism creature"></img>',
         )
 
+    def test_to_html_node_with_assets(self):
+        assets = AssetMap(
+            {"/images/logo.png": "/images/logo.0b1c2d3e.png"},
+            "public",
+            sizes={"/images/logo.png": (64, 48)},
+        )
+        image = TextNode("logo", TextType.Image, "/images/logo.png")
+        link = TextNode("logo", TextType.Link, "/images/logo.png")
+
+        self.assertEqual(
+            image.to_html_node(assets).to_html(),
+            '<img src="/images/logo.0b1c2d3e.png" alt="logo" width="64" height="48"></img>',
+        )
+        self.assertEqual(
+            link.to_html_node(assets).to_html(),
+            '<a href="/images/logo.0b1c2d3e.png">logo</a>',
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sys
+import tempfile
+import unittest
+from os import makedirs, mkdir, path
+
+from walk import scan_tree
+
+
+def touch(file_path: str):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8"):
+        pass
+
+
+class TestScanTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_yields_files_by_directory(self):
+        touch(path.join(self.root, "index.md"))
+        touch(path.join(self.root, "blog", "post.md"))
+        touch(path.join(self.root, "blog", "2024", "old.md"))
+        makedirs(path.join(self.root, "empty"))
+
+        tree = {
+            rel_dir: sorted(entry.name for entry in files)
+            for rel_dir, files in scan_tree(self.root)
+        }
+        self.assertEqual(
+            tree,
+            {
+                "": ["index.md"],
+                "blog": ["post.md"],
+                path.join("blog", "2024"): ["old.md"],
+                "empty": [],
+            },
+        )
+
+    def test_parents_before_children(self):
+        touch(path.join(self.root, "a", "b", "c", "file"))
+        rel_dirs = [rel_dir for rel_dir, _ in scan_tree(self.root)]
+        self.assertEqual(
+            rel_dirs, ["", "a", path.join("a", "b"), path.join("a", "b", "c")]
+        )
+
+    def test_deeper_than_recursion_limit(self):
+        deep_dir = self.root
+        for _ in range(250):
+            deep_dir = path.join(deep_dir, "d")
+            mkdir(deep_dir)
+        touch(path.join(deep_dir, "deep.md"))
+
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            files = [entry for _, files in scan_tree(self.root) for entry in files]
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+        self.assertEqual([entry.name for entry in files], ["deep.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
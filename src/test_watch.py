@@ -0,0 +1,63 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import tempfile
+import unittest
+from os import makedirs, path, remove, utime
+
+from watch import Changes, ReloadNotifier, Watcher, take_snapshot
+
+
+def write_file(file_path: str, text: str):
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.content = path.join(self.tmp.name, "content")
+        self.template = path.join(self.tmp.name, "template.html")
+        self.page = path.join(self.content, "blog", "index.md")
+        write_file(self.page, "# Blog")
+        write_file(self.template, "{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot(self):
+        snapshot = take_snapshot([self.content, self.template])
+        self.assertEqual(set(snapshot), {self.page, self.template})
+
+    def test_no_changes(self):
+        watcher = Watcher([self.content, self.template])
+        self.assertEqual(watcher.changes(), Changes([], []))
+
+    def test_changes(self):
+        watcher = Watcher([self.content, self.template])
+        new_page = path.join(self.content, "new.md")
+        write_file(new_page, "# New")
+        utime(self.template, ns=(0, 0))
+        remove(self.page)
+
+        changes = watcher.changes()
+        self.assertEqual(sorted(changes.changed), sorted([new_page, self.template]))
+        self.assertEqual(changes.removed, [self.page])
+        self.assertEqual(watcher.changes(), Changes([], []))
+
+
+class TestReloadNotifier(unittest.TestCase):
+    def test_wait_times_out_without_rebuild(self):
+        notifier = ReloadNotifier()
+        self.assertEqual(notifier.wait(notifier.version, timeout=0), 0)
+
+    def test_wait_returns_new_version(self):
+        notifier = ReloadNotifier()
+        notifier.notify()
+        self.assertEqual(notifier.wait(0, timeout=0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
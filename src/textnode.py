@@ -4,6 +4,7 @@ Provides intermediate representation for markdown text to be converted to `HTMLN
 
 from enum import Enum
 
+from assets import AssetMap
 from htmlnode import LeafNode
 
 TextType = Enum("TextNodeType", ["Normal", "Bold", "Italic", "Code", "Link", "Image"])
@@ -12,6 +13,8 @@ TextType = Enum("TextNodeType", ["Normal", "Bold", "Italic", "Code", "Link", "Im
 class TextNode:
     """Class for intermediate representation of markdown text"""
 
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str | None = None):
         self.text = text
         self.text_type = text_type
@@ -27,8 +30,12 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
-    def to_html_node(self) -> LeafNode:
-        """Converts `self` into an html `LeafNode`"""
+    def to_html_node(self, assets: AssetMap | None = None) -> LeafNode:
+        """
+        Converts `self` into an html `LeafNode`,
+        pointing links and images at fingerprinted copies of any assets in `assets`
+        and giving images their dimensions if they are known
+        """
         match self.text_type:
             case TextType.Normal:
                 return LeafNode(None, self.text)
@@ -39,10 +46,15 @@ class TextNode:
             case TextType.Code:
                 return LeafNode("code", self.text)
             case TextType.Link:
-                props = {"href": self.url}
+                url = assets.resolve(self.url) if assets else self.url
+                props = {"href": url}
                 return LeafNode("a", self.text, props)
             case TextType.Image:
-                props = {"src": self.url, "alt": self.text}
+                url = assets.resolve(self.url) if assets else self.url
+                props = {"src": url, "alt": self.text}
+                size = assets.size(self.url) if assets else None
+                if size:
+                    props["width"], props["height"] = size
                 return LeafNode("img", "", props)
             case _:
                 raise ValueError(
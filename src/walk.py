@@ -0,0 +1,28 @@
+"""
+Provides an iterative directory walker built on `os.scandir`, which reuses the file type
+information returned with each directory entry and never recurses
+"""
+
+from os import DirEntry, path, scandir
+from typing import Iterator
+
+
+def scan_tree(root: str) -> Iterator[tuple[str, list[DirEntry]]]:
+    """
+    Yields the path of each directory in `root`, relative to `root` (`""` for `root`
+    itself), together with the entries of the files directly inside it.
+    Each directory is yielded before its subdirectories. Only the entries of one
+    directory are held at a time, along with the paths of directories left to visit.
+    """
+    pending = [""]
+
+    while pending:
+        rel_dir = pending.pop()
+        files = []
+        with scandir(path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(path.join(rel_dir, entry.name))
+                else:
+                    files.append(entry)
+        yield rel_dir, files
@@ -0,0 +1,171 @@
+"""
+Provides change detection for watch mode by polling the file system,
+and a development server that reloads open pages after each rebuild
+"""
+
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from os import path, stat
+from threading import Condition, Thread
+from typing import Iterator, NamedTuple
+
+from walk import scan_tree
+
+RELOAD_PATH = "/__sitegen/reload"
+RELOAD_SCRIPT = (
+    f'<script>new EventSource("{RELOAD_PATH}").onmessage = '
+    "() => location.reload();</script>"
+).encode("utf-8")
+
+
+class Changes(NamedTuple):
+    """Files that have been added or modified, and files that have been removed"""
+
+    changed: list[str]
+    removed: list[str]
+
+
+def take_snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """
+    Returns the (modification time, size) of every file in `paths`,
+    searching directories with `scan_tree`
+    """
+    snapshot = {}
+
+    for item_path in paths:
+        if path.isdir(item_path):
+            for _, files in scan_tree(item_path):
+                for entry in files:
+                    entry_stat = entry.stat()
+                    snapshot[entry.path] = (entry_stat.st_mtime_ns, entry_stat.st_size)
+        elif path.exists(item_path):
+            item_stat = stat(item_path)
+            snapshot[item_path] = (item_stat.st_mtime_ns, item_stat.st_size)
+
+    return snapshot
+
+
+class Watcher:
+    """Detects changes to the files in `paths` by comparing successive snapshots"""
+
+    def __init__(self, paths: list[str]):
+        self.paths = paths
+        self.snapshot = take_snapshot(paths)
+
+    def changes(self) -> Changes:
+        """Returns the changes since the last call, or since the watcher was created"""
+        snapshot = take_snapshot(self.paths)
+
+        changed = [
+            file_path
+            for file_path, file_stat in snapshot.items()
+            if self.snapshot.get(file_path) != file_stat
+        ]
+        removed = [
+            file_path for file_path in self.snapshot if file_path not in snapshot
+        ]
+
+        self.snapshot = snapshot
+        return Changes(changed, removed)
+
+    def poll(self, interval: float = 0.2) -> Iterator[Changes]:
+        """Checks for changes every `interval` seconds, yielding each non-empty set"""
+        while True:
+            time.sleep(interval)
+            changes = self.changes()
+            if changes.changed or changes.removed:
+                yield changes
+
+
+class ReloadNotifier:
+    """Lets server threads wait until the next rebuild has finished"""
+
+    def __init__(self):
+        self.version = 0
+        self._condition = Condition()
+
+    def notify(self):
+        """Signals every waiting client that the site has been rebuilt"""
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        """Waits up to `timeout` seconds for a rebuild after `version`"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class ReloadingRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the built site, adding a script to each html page that reloads it
+    when the `ReloadNotifier` reports a rebuild
+    """
+
+    def __init__(self, *args, notifier: ReloadNotifier, **kwargs):
+        self.notifier = notifier
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            self.send_reload_events()
+            return
+
+        file_path = self.translate_path(self.path)
+        if path.isdir(file_path) and self.path.split("?")[0].endswith("/"):
+            file_path = path.join(file_path, "index.html")
+
+        if file_path.endswith(".html") and path.isfile(file_path):
+            self.send_html(file_path)
+        else:
+            super().do_GET()
+
+    def send_html(self, file_path: str):
+        """Sends the html file at `file_path` with the reload script injected"""
+        with open(file_path, "rb") as html_file:
+            html = html_file.read()
+
+        body_end = html.rfind(b"</body>")
+        if body_end == -1:
+            html += RELOAD_SCRIPT
+        else:
+            html = html[:body_end] + RELOAD_SCRIPT + html[body_end:]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(html)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(html)
+
+    def send_reload_events(self):
+        """Streams a server-sent event to the client after every rebuild"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        version = self.notifier.version
+        try:
+            while True:
+                new_version = self.notifier.wait(version, timeout=15)
+                if new_version == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+def serve(directory: str, port: int, notifier: ReloadNotifier) -> ThreadingHTTPServer:
+    """Serves `directory` on `port` from a background thread"""
+    handler = partial(ReloadingRequestHandler, directory=directory, notifier=notifier)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server